@@ -0,0 +1,69 @@
+"""Micro benchmark for hydrating documents with `_from_son`.
+
+Run with ``python -m benchmarks.hydration_bench``.
+"""
+import datetime
+import timeit
+from bson import ObjectId
+from mongo_driver import Document, EmbeddedDocument
+from mongo_driver.fields import (DateTimeField, DictField,
+                                 EmbeddedDocumentListField, IntField,
+                                 ListField, StringField)
+
+NUMBER = 10000
+
+
+class BenchEmbeddedDoc(EmbeddedDocument):
+    test_int = IntField()
+    test_str = StringField()
+
+
+class BenchFields(object):
+    test_int = IntField()
+    test_str = StringField()
+    test_date = DateTimeField()
+    test_list = ListField(IntField())
+    test_dict = DictField()
+    test_edocs = EmbeddedDocumentListField('BenchEmbeddedDoc')
+
+
+class BenchDoc(BenchFields, Document):
+    meta = {
+        'db_name': 'bench',
+    }
+
+
+class LazyBenchDoc(BenchFields, Document):
+    meta = {
+        'db_name': 'bench',
+        'lazy': True,
+    }
+
+
+SON_DATA = {
+    '_id': ObjectId(),
+    'test_int': 1,
+    'test_str': 'test',
+    'test_date': datetime.datetime(2019, 1, 1),
+    'test_list': list(range(10)),
+    'test_dict': {'a': 1, 'b': 2},
+    'test_edocs': [{'test_int': i, 'test_str': str(i)} for i in range(3)],
+}
+
+
+def hydrate():
+    BenchDoc._from_son(SON_DATA)
+
+
+def hydrate_lazy():
+    LazyBenchDoc._from_son(SON_DATA).test_int
+
+
+def main():
+    for name, func in (('eager', hydrate), ('lazy', hydrate_lazy)):
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=5))
+        print('%-10s %8.2f us/doc' % (name, 1e6 * seconds / NUMBER))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Micro benchmark for resolving pymongo collection handles.
+
+Run with ``python -m benchmarks.pymongo_handle_bench``. No running mongod is
+needed, pymongo clients connect lazily and no command is sent.
+"""
+import timeit
+from mongo_driver import Document, SlaveOkSetting, connect, clear_all
+from mongo_driver.connection import clear_collection_cache
+from mongo_driver.fields import IntField
+
+NUMBER = 20000
+
+
+class BenchDoc(Document):
+    meta = {
+        'db_name': 'bench',
+        'write_concern': 1,
+    }
+    test_int = IntField()
+
+
+def uncached():
+    clear_collection_cache()
+    BenchDoc._pymongo(slave_ok_setting=SlaveOkSetting.PRIMARY)
+
+
+def cached():
+    BenchDoc._pymongo(slave_ok_setting=SlaveOkSetting.PRIMARY)
+
+
+def main():
+    connect(db_names=['bench'])
+    try:
+        results = {}
+        for name, func in (('uncached', uncached), ('cached', cached)):
+            seconds = min(timeit.repeat(func, number=NUMBER, repeat=5))
+            results[name] = 1e6 * seconds / NUMBER
+            print('%-10s %8.2f us/call' % (name, results[name]))
+        print('%-10s %8.2f us/call (%.1fx)' % (
+            'saving', results['uncached'] - results['cached'],
+            results['uncached'] / results['cached']))
+    finally:
+        clear_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Micro benchmark for serializing documents with `to_mongo`.
+
+Run with ``python -m benchmarks.to_mongo_bench``.
+"""
+import datetime
+import timeit
+from mongo_driver import Document, EmbeddedDocument
+from mongo_driver.fields import (DateTimeField, DictField,
+                                 EmbeddedDocumentListField, IntField,
+                                 ListField, StringField)
+
+NUMBER = 10000
+
+
+class BenchEmbeddedDoc(EmbeddedDocument):
+    test_int = IntField()
+    test_str = StringField()
+
+
+class BenchDoc(Document):
+    meta = {
+        'db_name': 'bench',
+    }
+    test_int = IntField()
+    test_str = StringField()
+    test_date = DateTimeField()
+    test_list = ListField(IntField())
+    test_dict = DictField()
+    test_edocs = EmbeddedDocumentListField('BenchEmbeddedDoc')
+
+
+DOC = BenchDoc(
+    test_int=1,
+    test_str='test',
+    test_date=datetime.datetime(2019, 1, 1),
+    test_list=list(range(10)),
+    test_dict={'a': 1, 'b': 2},
+    test_edocs=[BenchEmbeddedDoc(test_int=i, test_str=str(i))
+                for i in range(3)],
+)
+
+
+def serialize():
+    DOC.to_mongo()
+
+
+def main():
+    seconds = min(timeit.repeat(serialize, number=NUMBER, repeat=5))
+    print('%-10s %8.2f us/doc' % ('to_mongo', 1e6 * seconds / NUMBER))
+
+
+if __name__ == '__main__':
+    main()
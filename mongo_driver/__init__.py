@@ -5,6 +5,9 @@ from mongo_driver.connection import *
 from mongo_driver.errors import *
 from mongo_driver.index import *
 from mongo_driver.session import *
+from mongo_driver.retry_policy import *
+from mongo_driver.identity import *
+from mongo_driver.query import *
 import mongo_driver.slave_ok_setting as slave_ok_setting
 import mongo_driver.document as document
 import mongo_driver.fields as fields
@@ -12,6 +15,9 @@ import mongo_driver.connection as connection
 import mongo_driver.errors as errors
 import mongo_driver.index as index
 import mongo_driver.session as session
+import mongo_driver.retry_policy as retry_policy
+import mongo_driver.identity as identity
+import mongo_driver.query as query
 __author__ = 'Jiaye Zhu'
 
 VERSION = (0, 1, 0)
@@ -19,7 +25,8 @@ VERSION = (0, 1, 0)
 __all__ = (list(document.__all__) + list(fields.__all__) +
            list(connection.__all__) + list(errors.__all__) +
            list(slave_ok_setting.__all__) + list(index.__all__) +
-           list(session.__all__)
+           list(session.__all__) + list(retry_policy.__all__) +
+           list(identity.__all__) + list(query.__all__)
            )
 
 
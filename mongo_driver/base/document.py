@@ -1,17 +1,18 @@
 import copy
 import numbers
+import weakref
 from functools import partial
 
 from bson import DBRef, ObjectId, SON, json_util
 import pymongo
 import six
-from six import iteritems
+from six import iteritems, itervalues
 
 from mongo_driver.base.common import get_document
 from mongo_driver.base.datastructures import (BaseDict, BaseList,
                                           EmbeddedDocumentList,
                                           StrictDict)
-from mongo_driver.base.fields import ComplexBaseField
+from mongo_driver.base.fields import BaseField, ComplexBaseField
 from mongo_driver.common import _import_class
 from mongo_driver.errors import (FieldDoesNotExist, InvalidDocumentError,
                              LookUpError, OperationError, ValidationError)
@@ -23,7 +24,7 @@ NON_FIELD_ERRORS = '__all__'
 
 class BaseDocument(object):
     __slots__ = ('_changed_fields', '_initialised', '_created', '_data',
-                 '_auto_id_field', '_db_field_map',
+                 '_lazy_data', '_auto_id_field', '_db_field_map',
                  '__weakref__')
 
     _dynamic = False
@@ -38,6 +39,7 @@ class BaseDocument(object):
         """
         self._initialised = False
         self._created = True
+        self._lazy_data = None
         if args:
             # Combine positional arguments with named arguments.
             # We only want named arguments.
@@ -125,7 +127,7 @@ class BaseDocument(object):
             self._is_document and
             not self__created and
             name in self._meta.get('shard_key', tuple()) and
-            self._data.get(name) != value
+            getattr(self, name, None) != value
         ):
             msg = 'Shard Keys are immutable. Tried to update %s' % name
             raise OperationError(msg)
@@ -151,7 +153,10 @@ class BaseDocument(object):
 
     def __setstate__(self, data):
         if isinstance(data['_data'], SON):
-            data['_data'] = self.__class__._from_son(data['_data'])._data
+            obj = self.__class__._from_son(data['_data'])
+            obj._decode_lazy_fields()
+            data['_data'] = obj._data
+        self._lazy_data = None
         for k in ('_changed_fields', '_initialised', '_created', '_data'):
             if k in data:
                 setattr(self, k, data[k])
@@ -188,6 +193,7 @@ class BaseDocument(object):
             return False
 
     def __len__(self):
+        self._decode_lazy_fields()
         return len(self._data)
 
     def __repr__(self):
@@ -233,50 +239,58 @@ class BaseDocument(object):
         """
         Return as SON data ready for use with MongoDB.
         """
-        if not fields:
-            fields = []
+        if self._lazy_data:
+            self._decode_lazy_fields()
 
         data = SON()
         data['_id'] = None
-        data['_cls'] = self._class_name
+        # Only add _cls if allow_inheritance is True
+        if self._meta.get('allow_inheritance'):
+            data['_cls'] = self._class_name
 
         # only root fields ['test1.a', 'test2'] => ['test1', 'test2']
-        root_fields = {f.split('.')[0] for f in fields}
+        root_fields = fields and {f.split('.')[0] for f in fields}
 
-        for field_name in self:
+        _data = self._data
+        for (field_name, field, db_field, accepts_fields, null,
+             auto_gen) in self._mongo_plan:
             if root_fields and field_name not in root_fields:
                 continue
 
-            value = self._data.get(field_name, None)
-            field = self._fields.get(field_name)
+            value = _data.get(field_name, None)
 
             if value is not None:
-                f_inputs = field.to_mongo.__code__.co_varnames
-                ex_vars = {}
-                if fields and 'fields' in f_inputs:
+                if fields and accepts_fields:
                     key = '%s.' % field_name
                     embedded_fields = [
                         i.replace(key, '') for i in fields
                         if i.startswith(key)]
-
-                    ex_vars['fields'] = embedded_fields
-
-                value = field.to_mongo(value, **ex_vars)
+                    value = field.to_mongo(value, fields=embedded_fields)
+                else:
+                    value = field.to_mongo(value)
 
             # Handle self generating fields
-            if value is None and field._auto_gen:
+            if value is None and auto_gen:
                 value = field.generate()
-                self._data[field_name] = value
+                _data[field_name] = value
 
-            if (value is not None) or (field.null):
-                data[field.db_field] = value
-
-        # Only add _cls if allow_inheritance is True
-        if not self._meta.get('allow_inheritance'):
-            data.pop('_cls')
+            if (value is not None) or null:
+                data[db_field] = value
 
         return data
 
+    @classmethod
+    def _compile_mongo_plan(cls):
+        """Return the (field name, field, db field, accepts fields, null,
+        auto gen) tuples `to_mongo` walks through, in field order. Called by
+        the metaclass once the fields are known.
+        """
+        return tuple(
+            (field_name, field, field.db_field,
+             field._to_mongo_accepts_fields, field.null, field._auto_gen)
+            for field_name, field in ((name, cls._fields[name])
+                                      for name in cls._fields_ordered))
+
     def validate(self, clean=True):
         """Ensure that all fields' values are valid and that required fields
         are present.
@@ -289,6 +303,8 @@ class BaseDocument(object):
             except ValidationError as error:
                 errors[NON_FIELD_ERRORS] = error
 
+        self._decode_lazy_fields()
+
         # Get a list of tuples of field names and their current values
         fields = [(self._fields.get(name), self._data.get(name))
                   for name in self._fields_ordered]
@@ -455,6 +471,37 @@ class BaseDocument(object):
                     changed_fields, key, data)
         return changed_fields
 
+    def _delta(self):
+        """Return the `$set` and `$unset` documents bringing the stored
+        document up to date with the changed fields of this one.
+        """
+        changed_fields = self._get_changed_fields()
+        if not changed_fields:
+            return {}, {}
+        # whole root fields, nested `fields` paths don't go through lists
+        doc = self.to_mongo(fields=list({
+            self._reverse_db_field_map.get(root, root)
+            for root in (path.split('.')[0] for path in changed_fields)}))
+        set_data, unset_data = {}, {}
+        missing = object()
+        for path in changed_fields:
+            value = doc
+            for part in path.split('.'):
+                if isinstance(value, (list, tuple)) and part.isdigit() and \
+                        int(part) < len(value):
+                    value = value[int(part)]
+                elif isinstance(value, dict) and part in value:
+                    value = value[part]
+                else:
+                    value = missing
+                    break
+            # None values of `null` fields are stored as such by to_mongo
+            if value is missing:
+                unset_data[path] = 1
+            else:
+                set_data[path] = value
+        return set_data, unset_data
+
     @classmethod
     def _get_collection_name(cls):
         """Return the collection name for this class. None for abstract
@@ -467,9 +514,6 @@ class BaseDocument(object):
         """Create an instance of a Document (subclass) from a PyMongo
         SON.
         """
-        if not only_fields:
-            only_fields = []
-
         if son and not isinstance(son, dict):
             raise ValueError(
                 "The source SON object needs to be of type 'dict'")
@@ -478,50 +522,214 @@ class BaseDocument(object):
         # class if unavailable
         class_name = son.get('_cls', cls._class_name)
 
-        # Convert SON to a data dict, making sure each key is a string and
-        # corresponds to the right db field.
-        data = {}
-        for key, value in iteritems(son):
-            key = str(key)
-            key = cls._db_field_map.get(key, key)
-            data[key] = value
-
         # Return correct subclass for document type
         if class_name != cls._class_name:
             cls = get_document(class_name)
 
-        changed_fields = []
-        errors_dict = {}
+        return cls._son_loader(son, only_fields, created)
 
-        fields = cls._fields
+    @classmethod
+    def _compile_son_loader(cls):
+        """Build the function used by `_from_son` to hydrate instances of
+        this class, called by the metaclass once the fields are known.
 
-        for field_name, field in iteritems(fields):
-            if field.db_field in data:
-                value = data[field.db_field]
-                try:
-                    data[field_name] = (value if value is None
-                                        else field.to_python(value))
-                    if field_name != field.db_field:
-                        del data[field.db_field]
-                except (AttributeError, ValueError) as e:
-                    errors_dict[field_name] = e
-
-        if errors_dict:
-            errors = '\n'.join(['%s - %s' % (k, v)
-                                for k, v in errors_dict.items()])
-            msg = ('Invalid data to create a `%s` instance.\n%s'
-                   % (cls._class_name, errors))
-            raise InvalidDocumentError(msg)
+        Everything that only depends on the field declarations is resolved
+        here: fields whose `to_python` is the identity are not converted,
+        values are written straight into `_data` and, as the instance is not
+        initialised yet, no change tracking happens while loading.
+
+        With `lazy` set in meta, values that need a conversion are kept in
+        `_lazy_data` as loaded and only converted when the field is first
+        accessed, see `_decode_lazy_field`.
+
+        Classes defining their own `__init__` are still instantiated through
+        it, with the converted values, see `_init_son_loader`.
+        """
+        EmbeddedDocument = _import_class('EmbeddedDocument')
+        EmbeddedDocumentField = _import_class('EmbeddedDocumentField')
+        if cls.__init__ not in (BaseDocument.__init__,
+                                EmbeddedDocument.__init__):
+            return cls._init_son_loader()
+
+        lazy = cls._meta.get('lazy', False)
+        plan = []
+        for field_name in cls._fields_ordered:
+            field = cls._fields[field_name]
+            field_cls = type(field)
+            to_python = (None if field_cls.to_python is BaseField.to_python
+                         else field.to_python)
+            setter = (None if field_cls.__set__ is BaseField.__set__
+                      else field.__set__)
+            links_instance = isinstance(
+                field, (ComplexBaseField, EmbeddedDocumentField))
+            defer = lazy and to_python is not None and setter is None
+            plan.append((field_name, field.db_field, to_python, setter,
+                         field.default, field.null, links_instance, defer))
+        plan = tuple(plan)
+
+        db_fields = frozenset(field.db_field
+                              for field in itervalues(cls._fields))
+        cls_is_field = '_cls' in cls._fields
+        has_choices = any(field.choices for field in itervalues(cls._fields))
+        is_embedded = not cls._is_document
+        class_name = cls._class_name
+        strict = cls.STRICT
+        if strict:
+            strict_dict = StrictDict.create(allowed_keys=cls._fields_ordered)
+        new = object.__new__
+        set_attr = object.__setattr__
+
+        def son_loader(son, only_fields=None, created=False):
+            obj = new(cls)
+            set_attr(obj, '_initialised', False)
+            set_attr(obj, '_created', created)
+            data = strict_dict() if strict else {}
+            set_attr(obj, '_data', data)
+            set_attr(obj, '_lazy_data', None)
+            if is_embedded:
+                set_attr(obj, '_instance', None)
+            lazy_data = {} if lazy else None
+
+            proxy = None
+            errors_dict = None
+            for (field_name, db_field, to_python, setter, default, null,
+                 links_instance, defer) in plan:
+                if db_field in son:
+                    value = son[db_field]
+                    if value is not None and to_python is not None:
+                        if defer:
+                            lazy_data[field_name] = value
+                            continue
+                        try:
+                            value = to_python(value)
+                        except (AttributeError, ValueError) as e:
+                            if errors_dict is None:
+                                errors_dict = {}
+                            errors_dict[field_name] = e
+                            continue
+                elif only_fields and db_field in only_fields:
+                    continue
+                else:
+                    value = None
+
+                if setter is not None:
+                    setter(obj, value)
+                    continue
+                if value is None and not null and default is not None:
+                    value = default() if callable(default) else default
+                if links_instance and value is not None:
+                    if isinstance(value, EmbeddedDocument):
+                        if proxy is None:
+                            proxy = weakref.proxy(obj)
+                        value._instance = proxy
+                    elif isinstance(value, (list, tuple)):
+                        for item in value:
+                            if isinstance(item, EmbeddedDocument):
+                                if proxy is None:
+                                    proxy = weakref.proxy(obj)
+                                item._instance = proxy
+                data[field_name] = value
+
+            if errors_dict:
+                errors = '\n'.join(['%s - %s' % (k, v)
+                                    for k, v in errors_dict.items()])
+                msg = ('Invalid data to create a `%s` instance.\n%s'
+                       % (class_name, errors))
+                raise InvalidDocumentError(msg)
+
+            if not strict:
+                for key, value in iteritems(son):
+                    if key not in db_fields and key != '_cls':
+                        data[key] = value
+            if not cls_is_field:
+                set_attr(obj, '_cls', son.get('_cls', class_name))
+            elif '_cls' not in son:
+                data['_cls'] = class_name
+
+            if has_choices:
+                obj.__set_field_display()
+
+            set_attr(obj, '_lazy_data', lazy_data or None)
+            set_attr(obj, '_changed_fields', [])
+            set_attr(obj, '_initialised', True)
+            return obj
+
+        return son_loader
 
-        # In STRICT documents, remove any keys that aren't in cls._fields
-        if cls.STRICT:
-            data = {k: v for k, v in iteritems(data) if k in cls._fields}
+    @classmethod
+    def _init_son_loader(cls):
+        """Hydration function of classes with their own `__init__`."""
+        fields = [(field_name, field.db_field, field)
+                  for field_name, field in iteritems(cls._fields)]
+        reverse_db_field_map = cls._reverse_db_field_map
+
+        def son_loader(son, only_fields=None, created=False):
+            data = {}
+            for key, value in iteritems(son):
+                key = str(key)
+                data[reverse_db_field_map.get(key, key)] = value
+            errors_dict = {}
+            for field_name, db_field, field in fields:
+                if field_name in data and data[field_name] is not None:
+                    try:
+                        data[field_name] = field.to_python(data[field_name])
+                    except (AttributeError, ValueError) as e:
+                        errors_dict[field_name] = e
+            if errors_dict:
+                errors = '\n'.join(['%s - %s' % (k, v)
+                                    for k, v in errors_dict.items()])
+                msg = ('Invalid data to create a `%s` instance.\n%s'
+                       % (cls._class_name, errors))
+                raise InvalidDocumentError(msg)
+            if cls.STRICT:
+                data = {k: v for k, v in iteritems(data)
+                        if k in cls._fields}
+            options = {'__auto_convert': False, '_created': created}
+            if only_fields:
+                options['__only_fields'] = only_fields
+            obj = cls(**dict(data, **options))
+            obj._changed_fields = []
+            return obj
+
+        return son_loader
+
+    def _decode_lazy_field(self, field_name):
+        """Convert the value of a field left undecoded by a lazy loader,
+        store it in `_data` and return it. Return None if there is nothing
+        to decode.
+        """
+        lazy_data = self._lazy_data
+        if not lazy_data or field_name not in lazy_data:
+            return None
+        field = self._fields[field_name]
+        try:
+            value = field.to_python(lazy_data[field_name])
+        except (AttributeError, ValueError) as e:
+            msg = ('Invalid data to create a `%s` instance.\n%s - %s'
+                   % (self._class_name, field_name, e))
+            raise InvalidDocumentError(msg)
+        del lazy_data[field_name]
 
-        obj = cls(__auto_convert=False, _created=created,
-                  __only_fields=only_fields, **data)
-        obj._changed_fields = changed_fields
+        if value is None and not field.null and field.default is not None:
+            value = field.default
+            if callable(value):
+                value = value()
+        EmbeddedDocument = _import_class('EmbeddedDocument')
+        if isinstance(value, EmbeddedDocument):
+            value._instance = weakref.proxy(self)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, EmbeddedDocument):
+                    item._instance = weakref.proxy(self)
+        self._data[field_name] = value
+        return value
 
-        return obj
+    def _decode_lazy_fields(self):
+        """Decode all the fields left undecoded by a lazy loader."""
+        lazy_data = self._lazy_data
+        if lazy_data:
+            for field_name in list(lazy_data):
+                self._decode_lazy_field(field_name)
 
     def __set_field_display(self):
         """For each field that specifies choices, create a
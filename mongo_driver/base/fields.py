@@ -15,6 +15,10 @@ from mongo_driver.errors import ValidationError
 
 __all__ = ('BaseField', 'ComplexBaseField', 'ObjectIdField')
 
+# Marks fields missing from `_data`, which may still be waiting in
+# `_lazy_data` to be decoded
+_UNDECODED = object()
+
 
 class BaseField(object):
     """A base class for fields in a MongoDB document. Instances of this class
@@ -56,6 +60,10 @@ class BaseField(object):
         self.choices = choices
         self.null = null
         self._owner_document = None
+        # Whether `to_mongo` takes the `fields` argument, checked once here
+        # rather than on every serialization
+        self._to_mongo_accepts_fields = (
+            'fields' in self.to_mongo.__code__.co_varnames)
         # Detect and report conflicts between metadata and base properties.
         conflicts = set(dir(self)) & set(kwargs)
         if conflicts:
@@ -81,8 +89,12 @@ class BaseField(object):
             # Document class being used rather than a document object
             return self
 
-        # Get value from document instance if available
-        return instance._data.get(self.name)
+        # Get value from document instance if available, decoding it first
+        # if it was loaded lazily
+        value = instance._data.get(self.name, _UNDECODED)
+        if value is _UNDECODED:
+            return instance._decode_lazy_field(self.name)
+        return value
 
     def __set__(self, instance, value):
         """Descriptor for assigning a value to a field in a document.
@@ -99,6 +111,9 @@ class BaseField(object):
 
         if instance._initialised:
             try:
+                if instance._lazy_data and self.name in instance._lazy_data:
+                    # compare with the loaded value, not decoded yet
+                    instance._decode_lazy_field(self.name)
                 if (self.name not in instance._data or
                         instance._data[self.name] != value):
                     instance._mark_as_changed(self.name)
@@ -107,6 +122,9 @@ class BaseField(object):
                 # So mark it as changed
                 instance._mark_as_changed(self.name)
 
+        if instance._lazy_data:
+            instance._lazy_data.pop(self.name, None)
+
         EmbeddedDocument = _import_class('EmbeddedDocument')
         if isinstance(value, EmbeddedDocument):
             value._instance = weakref.proxy(instance)
@@ -131,12 +149,9 @@ class BaseField(object):
 
     def _to_mongo_safe_call(self, value, fields=None):
         """Helper method to call to_mongo with proper inputs."""
-        f_inputs = self.to_mongo.__code__.co_varnames
-        ex_vars = {}
-        if 'fields' in f_inputs:
-            ex_vars['fields'] = fields
-
-        return self.to_mongo(value, **ex_vars)
+        if self._to_mongo_accepts_fields:
+            return self.to_mongo(value, fields=fields)
+        return self.to_mongo(value)
 
     def prepare_query_value(self, op, value):
         """Prepare a value that is being used in a query for PyMongo."""
@@ -264,12 +279,10 @@ class ComplexBaseField(BaseField):
 
     def to_mongo(self, value, fields=None):
         """Convert a Python type to a MongoDB-compatible type."""
-        Document = _import_class('Document')
-        EmbeddedDocument = _import_class('EmbeddedDocument')
-
         if isinstance(value, six.string_types):
             return value
 
+        EmbeddedDocument = _import_class('EmbeddedDocument')
         if hasattr(value, 'to_mongo'):
             cls = value.__class__
             val = value.to_mongo(fields)
@@ -278,6 +291,11 @@ class ComplexBaseField(BaseField):
                 val['_cls'] = cls.__name__
             return val
 
+        if self.field and isinstance(value, (list, tuple)):
+            to_mongo = self.field._to_mongo_safe_call
+            return [to_mongo(item, fields) for item in value]
+
+        Document = _import_class('Document')
         is_list = False
         if not hasattr(value, 'items'):
             try:
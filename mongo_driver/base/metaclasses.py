@@ -153,6 +153,11 @@ class DocumentMetaclass(type):
         # Add class to the _document_registry
         _document_registry[new_class._class_name] = new_class
 
+        # Precompute the hydration function used by _from_son and the
+        # serialization plan used by to_mongo
+        new_class._son_loader = staticmethod(new_class._compile_son_loader())
+        new_class._mongo_plan = new_class._compile_mongo_plan()
+
         # In Python 2, User-defined methods objects have special read-only
         # attributes 'im_func' and 'im_self' which contain the function obj
         # and class instance object respectively.  With Python 3 these special
@@ -329,6 +334,10 @@ class TopLevelDocumentMetaclass(DocumentMetaclass):
             exception = type(name, parents, {'__module__': module})
             setattr(new_class, name, exception)
 
+        # The id field may have been added above, compile again
+        new_class._son_loader = staticmethod(new_class._compile_son_loader())
+        new_class._mongo_plan = new_class._compile_mongo_plan()
+
         return new_class
 
     @classmethod
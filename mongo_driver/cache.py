@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+from bson import BSON
+
+__all__ = ('DocumentCache', )
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+class DocumentCache(object):
+    """LRU cache of documents as stored, with a time to live.
+
+    Documents are kept BSON encoded, each hit is decoded again so cached
+    documents cannot be changed through the instances built from them.
+    """
+
+    def __init__(self, ttl=60, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expire_at, data = entry
+            if expire_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return BSON(data).decode()
+
+    def set(self, key, son):
+        data = BSON.encode(son)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def get_document_cache(cls):
+    """The cache of the collection of `cls` configured by `cache` in its
+    meta, e.g. {'ttl': 60, 'max_entries': 10000}, or None.
+    """
+    options = cls._meta.get('cache')
+    if not options:
+        return None
+    key = (cls._meta['db_name'], cls._meta['collection'])
+    cache = _caches.get(key)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(key)
+            if cache is None:
+                cache = _caches[key] = DocumentCache(
+                    **(options if isinstance(options, dict) else {}))
+    return cache
+
+
+def clear_document_caches():
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.clear()
@@ -1,26 +1,38 @@
 from pymongo.mongo_client import MongoClient
-from pymongo.read_preferences import ReadPreference
+from pymongo.read_preferences import ReadPreference, Primary, \
+    PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
 from pymongo.read_concern import ReadConcern
 from mongo_driver.errors import ConnectionError
 from mongo_driver.session import Session
+from mongo_driver.cache import clear_document_caches
 import collections
+import os
+import threading
 
 __all__ = ['connect', 'get_db', 'get_connection', 'clear_all', 'get_admin_db',
+           'route_reads', 'ReadRoute',
            'DEFAULT_WRITE_CONCERN', 'DEFAULT_WTIMEOUT']
 
-_connections = {}
-_dbs = {}
-_db_to_conn = {}
-
 DEFAULT_WRITE_CONCERN = 'majority'
 DEFAULT_WTIMEOUT = 5000
 DEFAULT_READ_CONCERN_LEVEL = 'majority'
 
 
 class Connection(object):
-    def __init__(self, conn_name, mongo_client):
+    """A named client, created on first use from the keyword arguments
+    `connect_kwargs` given to `connect`.
+
+    The client is bound to the process creating it: used from a forked
+    child, e.g. a pre-fork worker, a new client is built from the same
+    arguments instead of sharing the sockets of the parent.
+    """
+
+    def __init__(self, conn_name, connect_kwargs):
         self._conn_name = conn_name
-        self._mongo_client = mongo_client
+        self.connect_kwargs = connect_kwargs
+        self._mongo_client = None
+        self._pid = None
+        self._lock = threading.Lock()
 
     @property
     def name(self):
@@ -28,49 +40,244 @@ class Connection(object):
 
     @property
     def pymongo_client(self):
-        return self._mongo_client
+        mongo_client = self._mongo_client
+        if mongo_client is None or self._pid != os.getpid():
+            with self._lock:
+                mongo_client = self._mongo_client
+                if mongo_client is None or self._pid != os.getpid():
+                    mongo_client = self._mongo_client = self._create_client()
+                    self._pid = os.getpid()
+        return mongo_client
+
+    def _create_client(self):
+        client_class, client_kwargs = _client_args(**self.connect_kwargs)
+        try:
+            return client_class(**client_kwargs)
+        except Exception as e:
+            raise ConnectionError(
+                'Cannot connect to the database: %s' % str(e))
 
     def start_session(self):
-        pymongo_client = self._mongo_client
+        pymongo_client = self.pymongo_client
         pymongo_client_session = pymongo_client.start_session()
         return Session(pymongo_client_session)
 
 
+class ReadRoute(object):
+    """Where the reads of a collection go: the client of the connection
+    `conn_name` (by default the one of the database) with the read
+    preference `read_preference`, one of 'primary', 'primaryPreferred',
+    'secondary', 'secondaryPreferred' or 'nearest', restricted to the
+    members matching `tag_sets` and lagging at most `max_staleness`
+    seconds (-1 for no limit). Without `read_preference` the slave ok
+    setting of the read is used.
+    """
+
+    READ_PREFERENCES = {
+        'primary': Primary,
+        'primaryPreferred': PrimaryPreferred,
+        'secondary': Secondary,
+        'secondaryPreferred': SecondaryPreferred,
+        'nearest': Nearest,
+    }
+
+    def __init__(self, conn_name=None, read_preference=None, tag_sets=None,
+                 max_staleness=-1):
+        if (read_preference is not None and
+                read_preference not in self.READ_PREFERENCES):
+            raise ValueError('Unknown read preference %s' % read_preference)
+        self.conn_name = conn_name
+        self.read_preference = read_preference
+        self.tag_sets = tag_sets
+        self.max_staleness = max_staleness
+
+    def pymongo_read_preference(self, default=None):
+        if self.read_preference is None:
+            return default
+        read_preference_class = self.READ_PREFERENCES[self.read_preference]
+        if read_preference_class is Primary:
+            return Primary()
+        return read_preference_class(tag_sets=self.tag_sets,
+                                     max_staleness=self.max_staleness)
+
+    def _key(self):
+        tag_sets = self.tag_sets and tuple(
+            tuple(sorted(tag_set.items())) for tag_set in self.tag_sets)
+        return (self.conn_name, self.read_preference, tag_sets,
+                self.max_staleness)
+
+    def __eq__(self, other):
+        return isinstance(other, ReadRoute) and self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._key())
+
+
+class ConnectionRegistry(object):
+    """Connections by name, the connection of each database and the
+    database and collection handles built from them.
+
+    Everything is guarded by one lock. Handles created before a fork are
+    not used in the child process: the first lookup after the process id
+    changed drops them, they are created again from the new clients of the
+    connections.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+        self._connections = {}
+        self._dbs = {}
+        self._db_to_conn = {}
+        self._collections = {}
+        self._read_routes = {}
+
+    def _check_pid(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._dbs = {}
+            self._collections = {}
+            clear_document_caches()
+            self._pid = os.getpid()
+
+    def add_connection(self, conn, db_names):
+        with self._lock:
+            if conn.name in self._connections:
+                return self._connections[conn.name]
+            self._connections[conn.name] = conn
+            for db_name in db_names:
+                self._db_to_conn[db_name] = conn.name
+                self._dbs.pop(db_name, None)
+            # cached collection handles may now resolve to another client
+            self._collections = {}
+            return conn
+
+    def get_connection(self, conn_name="main", db_name=None):
+        self._check_pid()
+        if db_name:
+            conn_name = self._db_to_conn.get(db_name, None)
+        return self._connections.get(conn_name, None)
+
+    def get_db(self, db_name):
+        self._check_pid()
+        db = self._dbs.get(db_name)
+        if db is not None:
+            return db
+        with self._lock:
+            db = self._dbs.get(db_name)
+            if db is None:
+                conn = self._connections.get(
+                    self._db_to_conn.get(db_name, None), None)
+                if conn is None:
+                    return None
+                db = self._dbs[db_name] = conn.pymongo_client[db_name]
+            return db
+
+    def get_cached_collection(self, key):
+        self._check_pid()
+        return self._collections.get(key, None)
+
+    def cache_collection(self, key, collection):
+        with self._lock:
+            self._collections[key] = collection
+
+    def clear_collection_cache(self):
+        with self._lock:
+            self._collections = {}
+
+    def get_read_route(self, db_name):
+        return self._read_routes.get(db_name, None)
+
+    def set_read_route(self, db_name, route):
+        with self._lock:
+            if route is None:
+                self._read_routes.pop(db_name, None)
+            else:
+                self._read_routes[db_name] = route
+
+    def clear(self):
+        with self._lock:
+            self._connections = {}
+            self._dbs = {}
+            self._db_to_conn = {}
+            self._collections = {}
+            self._read_routes = {}
+            clear_document_caches()
+
+
+_registry = ConnectionRegistry()
+
+
 def get_connection(conn_name="main", db_name=None):
-    if db_name:
-        conn_name = _db_to_conn.get(db_name, None)
-    return _connections.get(conn_name, None)
+    return _registry.get_connection(conn_name=conn_name, db_name=db_name)
 
 
 def get_db(db_name):
-    global _dbs, _connections, _db_to_conn
-    if db_name not in _dbs or not _dbs[db_name]:
-        conn_name = _db_to_conn.get(db_name, None)
-        conn = _connections.get(conn_name, None)
-        _dbs[db_name] = conn and conn.pymongo_client[db_name]
-    return _dbs[db_name]
+    return _registry.get_db(db_name)
 
 
 def get_admin_db(conn_name='main'):
-    conn = _connections.get(conn_name, None)
+    conn = _registry.get_connection(conn_name)
     return conn.pymongo_client.admin
 
 
-def clear_all():
-    global _connections, _dbs, _db_to_conn
-    _connections = {}
-    _dbs = {}
-    _db_to_conn = {}
+def get_cached_collection(key):
+    return _registry.get_cached_collection(key)
 
 
-def connect(host='localhost', conn_name='main', db_names=[],
-            port=27017, max_pool_size=None, w=DEFAULT_WRITE_CONCERN,
-            wtimeout=DEFAULT_WTIMEOUT, socketTimeoutMS=None,
-            connectTimeoutMS=None, waitQueueTimeoutMS=None,
-            username=None, password=None, auth_db='admin', is_mock=False,
-            replica_set=None):
-    global _connections, _db_to_conn
+def cache_collection(key, collection):
+    _registry.cache_collection(key, collection)
+
+
+def clear_collection_cache():
+    _registry.clear_collection_cache()
+
+
+def route_reads(db_name, conn_name=None, read_preference=None,
+                tag_sets=None, max_staleness=-1):
+    """Send the reads of the collections of `db_name` to another
+    connection or read preference, see `ReadRoute`. Writes still go to the
+    connection of the database. Without arguments the route is removed.
 
+    The `read_route` meta of a document class, a ReadRoute or its keyword
+    arguments, takes precedence over the route of its database.
+    """
+    route = None
+    if conn_name is not None or read_preference is not None:
+        route = ReadRoute(conn_name=conn_name,
+                          read_preference=read_preference,
+                          tag_sets=tag_sets, max_staleness=max_staleness)
+    _registry.set_read_route(db_name, route)
+
+
+def get_read_route(document_class):
+    """The ReadRoute of the reads of `document_class`, or None."""
+    route = document_class._meta.get('read_route')
+    if route is None:
+        return _registry.get_read_route(document_class._meta['db_name'])
+    if isinstance(route, dict):
+        return ReadRoute(**route)
+    return route
+
+
+def clear_all():
+    _registry.clear()
+
+
+def _client_args(host='localhost', port=27017, max_pool_size=None,
+                 w=DEFAULT_WRITE_CONCERN, wtimeout=DEFAULT_WTIMEOUT,
+                 socketTimeoutMS=None, connectTimeoutMS=None,
+                 waitQueueTimeoutMS=None, username=None, password=None,
+                 auth_db='admin', is_mock=False, replica_set=None):
+    """Return the client class and its keyword arguments for the
+    arguments of `connect`.
+    """
     mongo_client_kwargs = {
         'host': host,
         'port': port,
@@ -99,18 +306,31 @@ def connect(host='localhost', conn_name='main', db_names=[],
             raise RuntimeError('You need mongomock installed to mock mongodb')
     else:
         client_class = MongoClient
-    # Connect to the database if not already connected
-    if conn_name not in _connections:
-        try:
-            mongo_client = client_class(**mongo_client_kwargs)
-            # conn.admin.command('ismaster')
-            _connections[conn_name] = Connection(conn_name, mongo_client)
-        except Exception as e:
-            raise ConnectionError(
-                'Cannot connect to the database: %s' % str(e))
+    return client_class, mongo_client_kwargs
 
-        if db_names:
-            for db in db_names:
-                _db_to_conn[db] = conn_name
 
-    return _connections[conn_name]
+def connect(host='localhost', conn_name='main', db_names=[],
+            port=27017, max_pool_size=None, w=DEFAULT_WRITE_CONCERN,
+            wtimeout=DEFAULT_WTIMEOUT, socketTimeoutMS=None,
+            connectTimeoutMS=None, waitQueueTimeoutMS=None,
+            username=None, password=None, auth_db='admin', is_mock=False,
+            replica_set=None):
+    connect_kwargs = {
+        'host': host,
+        'port': port,
+        'max_pool_size': max_pool_size,
+        'w': w,
+        'wtimeout': wtimeout,
+        'socketTimeoutMS': socketTimeoutMS,
+        'connectTimeoutMS': connectTimeoutMS,
+        'waitQueueTimeoutMS': waitQueueTimeoutMS,
+        'username': username,
+        'password': password,
+        'auth_db': auth_db,
+        'is_mock': is_mock,
+        'replica_set': replica_set}
+    # raises now rather than on first use if mongomock is missing
+    _client_args(**connect_kwargs)
+    # the client is only created when the connection is first used
+    conn = Connection(conn_name, connect_kwargs)
+    return _registry.add_connection(conn, db_names or [])
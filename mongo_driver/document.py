@@ -9,6 +9,7 @@ from mongo_driver.base import (BaseDocument,
                            TopLevelDocumentMetaclass)
 from mongo_driver.mixin.read_mixin import ReadMixin
 from mongo_driver.mixin.write_mixin import WriteMixin
+from mongo_driver.mixin.async_mixin import AsyncMixin
 
 __all__ = ('Document', 'EmbeddedDocument')
 
@@ -46,6 +47,8 @@ class EmbeddedDocument(six.with_metaclass(DocumentMetaclass, BaseDocument)):
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
+            self._decode_lazy_fields()
+            other._decode_lazy_fields()
             return self._data == other._data
         return False
 
@@ -62,7 +65,7 @@ class EmbeddedDocument(six.with_metaclass(DocumentMetaclass, BaseDocument)):
         return data
 
 
-class Document(six.with_metaclass(TopLevelDocumentMetaclass, BaseDocument, ReadMixin, WriteMixin)):
+class Document(six.with_metaclass(TopLevelDocumentMetaclass, BaseDocument, ReadMixin, WriteMixin, AsyncMixin)):
     """The base class used for defining the structure and properties of
     collections of documents stored in MongoDB. Inherit from this class, and
     add fields as class attributes to define a document's structure.
@@ -6,7 +6,7 @@ from six import iteritems
 __all__ = ('NotRegistered', 'InvalidDocumentError', 'LookUpError',
            'DoesNotExist', 'MultipleObjectsReturned', 'InvalidQueryError',
            'OperationError', 'NotUniqueError', 'FieldDoesNotExist',
-           'ValidationError', 'SaveConditionError')
+           'ValidationError', 'SaveConditionError', 'GatherTimeoutError')
 
 
 class IUMongoError(Exception):
@@ -48,6 +48,10 @@ class NotUniqueError(OperationError):
 class SaveConditionError(OperationError):
     pass
 
+
+class GatherTimeoutError(OperationError):
+    pass
+
 class TransactionError(OperationError):
     pass
     
@@ -60,10 +64,29 @@ class ConnectionError(IUMongoError):
 
 
 class BulkOperationError(OperationError):
-    def __init__(self, pymongo_bulk_write_error):
+    """Raised when a bulk write fails.
+
+    :ivar chunk_errors: (offset, pymongo BulkWriteError) pairs, one per
+        failed flush, offset being the index of the first request of the
+        flushed chunk.
+    """
+
+    def __init__(self, pymongo_bulk_write_error, chunk_errors=None):
         self._pymongo_error = pymongo_bulk_write_error
+        self.chunk_errors = chunk_errors or [(0, pymongo_bulk_write_error)]
         super(BulkOperationError, self).__init__('Bulk Write Error')
 
+    @property
+    def write_errors(self):
+        """Write errors of all chunks, indexed from the first request."""
+        errors = []
+        for offset, error in self.chunk_errors:
+            for write_error in error.details.get('writeErrors', []):
+                write_error = dict(write_error)
+                write_error['index'] += offset
+                errors.append(write_error)
+        return errors
+
 
 class ValidationError(AssertionError):
     """Validation exception.
@@ -0,0 +1,54 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# threads of the default executor, pymongo connections are taken from the
+# client pools so they should allow as many connections
+MAX_WORKERS = 32
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """The executor running the blocking pymongo calls of the async and
+    concurrent APIs, created on first use and again in forked processes,
+    which do not inherit the threads of the parent.
+    """
+    global _executor, _executor_pid
+    executor = _executor
+    if executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            executor = _executor
+            if executor is None or _executor_pid != os.getpid():
+                executor = _executor = ThreadPoolExecutor(
+                    max_workers=MAX_WORKERS, thread_name_prefix='mongo_driver')
+                _executor_pid = os.getpid()
+    return executor
+
+
+def set_executor(executor):
+    """Replace the executor, the previous one is not shut down."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        _executor = executor
+        _executor_pid = os.getpid()
+
+
+def submit(func, *args, **kwargs):
+    """Run `func` in the executor within a copy of the current context, so
+    that identity maps and retry scopes carry over.
+    """
+    context = contextvars.copy_context()
+    return get_executor().submit(context.run, func, *args, **kwargs)
+
+
+async def run_in_executor(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(context.run, func, *args, **kwargs))
@@ -0,0 +1,78 @@
+import contextlib
+import contextvars
+
+__all__ = ('IdentityMap', 'identity_map')
+
+_current = contextvars.ContextVar('mongo_driver_identity_map', default=None)
+
+
+class IdentityMap(object):
+    """Documents loaded by id during a unit of work.
+
+    While a map is active, `find_one` by `_id`, `by_id` and `by_ids` return
+    the instance already loaded for an id instead of reading it again.
+    Writes through the document class drop the entries they may change.
+    """
+
+    def __init__(self):
+        self._documents = {}
+
+    @staticmethod
+    def _collection_key(cls):
+        return (cls._meta['db_name'], cls._meta['collection'])
+
+    def get(self, cls, doc_id):
+        doc = self._documents.get((self._collection_key(cls), doc_id))
+        if doc is not None and isinstance(doc, cls):
+            return doc
+        return None
+
+    def add(self, doc):
+        if doc is not None and doc.id is not None:
+            self._documents[(self._collection_key(doc), doc.id)] = doc
+
+    def discard(self, cls, doc_id=None):
+        """Drop the document `doc_id` of the collection of `cls`, or all the
+        documents of that collection.
+        """
+        collection_key = self._collection_key(cls)
+        if doc_id is not None:
+            self._documents.pop((collection_key, doc_id), None)
+            return
+        for key in list(self._documents):
+            if key[0] == collection_key:
+                del self._documents[key]
+
+    def clear(self):
+        self._documents = {}
+
+    def __len__(self):
+        return len(self._documents)
+
+
+@contextlib.contextmanager
+def identity_map(session=None):
+    """Use an identity map for the reads in the block, or for the reads
+    made with `session` when given.
+    """
+    id_map = IdentityMap()
+    if session is not None:
+        session.identity_map = id_map
+        try:
+            yield id_map
+        finally:
+            session.identity_map = None
+        return
+    token = _current.set(id_map)
+    try:
+        yield id_map
+    finally:
+        _current.reset(token)
+
+
+def get_identity_map(session=None):
+    """The identity map of `session`, or of the current context."""
+    id_map = getattr(session, 'identity_map', None)
+    if id_map is not None:
+        return id_map
+    return _current.get()
@@ -0,0 +1,96 @@
+import contextlib
+from itertools import islice
+from mongo_driver.executor import run_in_executor
+from mongo_driver.mixin.base import BaseMixin
+from mongo_driver.mixin.bulk_mixin import BulkContext
+from mongo_driver import SlaveOkSetting
+
+
+def _next_batch(cur, batch_size):
+    return list(islice(cur, batch_size))
+
+
+class AsyncMixin(BaseMixin):
+    """Asyncio counterparts of the read and write methods.
+
+    The blocking pymongo calls run in the shared executor of
+    `mongo_driver.executor`, the event loop only waits for them. Filters,
+    hydration, retries and instrumentation are those of the blocking
+    methods.
+    """
+
+    @classmethod
+    async def afind(cls, filter, **kwargs):
+        return await run_in_executor(cls.find, filter, **kwargs)
+
+    @classmethod
+    async def afind_iter(cls, filter, projection=None, skip=0, limit=0,
+                         sort=None, slave_ok=SlaveOkSetting.PRIMARY,
+                         batch_size=1000, max_time_ms=None, raw=False):
+        """Async generator of the documents matching `filter`, each batch
+        of `batch_size` documents is fetched in the executor.
+        """
+        cur = cls._find_raw(filter, projection=projection, skip=skip,
+                            limit=limit, sort=sort, slave_ok=slave_ok,
+                            batch_size=batch_size, max_time_ms=max_time_ms)
+        convert = cls._son_converter(raw)
+        try:
+            while True:
+                batch = await run_in_executor(_next_batch, cur, batch_size)
+                if not batch:
+                    return
+                for son in batch:
+                    yield convert(son)
+        finally:
+            # closing may send a killCursors command
+            await run_in_executor(cur.close)
+
+    @classmethod
+    async def afind_one(cls, filter, **kwargs):
+        return await run_in_executor(cls.find_one, filter, **kwargs)
+
+    @classmethod
+    async def aby_id(cls, doc_id, **kwargs):
+        return await run_in_executor(cls.by_id, doc_id, **kwargs)
+
+    @classmethod
+    async def aby_ids(cls, doc_ids, **kwargs):
+        return await run_in_executor(cls.by_ids, doc_ids, **kwargs)
+
+    @classmethod
+    async def acount(cls, filter={}, **kwargs):
+        return await run_in_executor(cls.count, filter, **kwargs)
+
+    @classmethod
+    async def aupdate(cls, filter, document, **kwargs):
+        return await run_in_executor(cls.update, filter, document, **kwargs)
+
+    @classmethod
+    async def aremove(cls, filter, **kwargs):
+        return await run_in_executor(cls.remove, filter, **kwargs)
+
+    async def asave(self, **kwargs):
+        return await run_in_executor(self.save, **kwargs)
+
+    async def aupdate_one(self, document, **kwargs):
+        return await run_in_executor(self.update_one, document, **kwargs)
+
+    @classmethod
+    @contextlib.asynccontextmanager
+    async def abulk(cls, unordered=False, max_ops=None, max_bytes=None):
+        """Async counterpart of `bulk`, the requests are sent in the
+        executor when the block exits. Chunks flushed by `max_ops` or
+        `max_bytes` are written by a background thread; they are handed
+        to it without waiting, so queueing a request never blocks the event
+        loop, and wait in memory while the writer is behind.
+        """
+        bulk_context = BulkContext(
+            cls._pymongo(), not unordered, max_ops=max_ops,
+            max_bytes=max_bytes, background=bool(max_ops or max_bytes),
+            queue_size=0, document_class=cls)
+        try:
+            yield bulk_context
+        except BaseException:
+            await run_in_executor(bulk_context.close)
+            raise
+        await run_in_executor(bulk_context.execute)
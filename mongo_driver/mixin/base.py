@@ -12,12 +12,9 @@ from mongo_driver.connection import ConnectionError, get_connection
 from mongo_driver.session import Session
 from mongo_driver import SlaveOkSetting
 from mongo_driver.utils.terminal import color_terminal, Color
-
-RETRY_ERRORS = (
-    pymongo.errors.ConnectionFailure,
-    ConnectionError
-)
-RETRY_LOGGER = logging.getLogger('mongo_driver.pymongo_retry')
+from mongo_driver.retry_policy import RETRY_ERRORS, RETRY_LOGGER
+from mongo_driver.identity import get_identity_map
+from mongo_driver.cache import get_document_cache
 
 
 class BaseMixin(object):
@@ -46,31 +43,69 @@ class BaseMixin(object):
         return key
 
     @classmethod
-    def _pymongo(cls, create=False, slave_ok_setting=None):
-        from mongo_driver.connection import get_db
-        database = None
-        collection = None
+    def _invalidate_cached(cls, doc_id=None, session=None, keep=None):
+        """Drop the copies of documents that a write may change: the
+        document `doc_id` (unless it is the instance `keep`), or all the
+        documents of the collection, from the active identity map, and the
+        whole read-through cache of the collection (see `meta['cache']`).
+        """
+        id_map = get_identity_map(session)
+        if id_map is not None and (
+                keep is None or id_map.get(cls, doc_id) is not keep):
+            id_map.discard(cls, doc_id)
+        cache = get_document_cache(cls)
+        if cache is not None:
+            cache.clear()
+
+    @classmethod
+    def _pymongo(cls, create=False, slave_ok_setting=None, session=None):
+        """The pymongo collection of the class. Reads, given a
+        `slave_ok_setting`, follow the read route of the class or its
+        database (see `route_reads`) unless they use a session, which
+        belongs to the client of the database; writes never do.
+        """
+        from mongo_driver.connection import get_db, get_cached_collection, \
+            cache_collection, get_read_route
         database = get_db(cls._meta['db_name'])
-        collection_name = cls._meta['collection']
-        if database:
-            try:
-                collection = Collection(
-                    database, collection_name, create=create)
-            except pymongo.errors.OperationFailure:
-                collection = Collection(database, collection_name)
-        if not collection or not database:
+        if database is None:
             raise ConnectionError(
                 'No mongo connections for collection %s' % cls.__name__)
         # override default configuration if possible
-        read_preference = SlaveOkSetting.TO_PYMONGO.get(slave_ok_setting, None)
-        default_write_concern = collection.write_concern
+        default_write_concern = database.write_concern.document
         w = cls._meta.get(
-            "write_concern", default_write_concern.document.get('w', None))
+            "write_concern", default_write_concern.get('w', None))
         wtimeout = cls._meta.get(
-            "wtimeout", default_write_concern.document.get('wtimeout', None))
-        return collection.with_options(
+            "wtimeout", default_write_concern.get('wtimeout', None))
+        route = None
+        if slave_ok_setting is not None and session is None:
+            route = get_read_route(cls)
+        # handles are cached until the next connect() or clear_all()
+        cache_key = (cls, slave_ok_setting, w, wtimeout, route)
+        if not create:
+            collection = get_cached_collection(cache_key)
+            if collection is not None:
+                return collection
+        read_preference = SlaveOkSetting.TO_PYMONGO.get(slave_ok_setting, None)
+        if route is not None:
+            if route.conn_name is not None:
+                conn = get_connection(route.conn_name)
+                if conn is None:
+                    raise ConnectionError(
+                        'No mongo connection %s for reads of collection %s' %
+                        (route.conn_name, cls.__name__))
+                database = conn.pymongo_client[cls._meta['db_name']]
+            read_preference = route.pymongo_read_preference(read_preference)
+        collection_name = cls._meta['collection']
+        try:
+            collection = Collection(
+                database, collection_name, create=create)
+        except pymongo.errors.OperationFailure:
+            collection = Collection(database, collection_name)
+        collection = collection.with_options(
             read_preference=read_preference,
             write_concern=WriteConcern(w=w, wtimeout=wtimeout))
+        cache_collection(cache_key, collection)
+        return collection
 
     @classmethod
     def _update_filter(cls, filter):
@@ -121,8 +156,8 @@ class BaseMixin(object):
                 IndexDefinition.parse_from_keys_str('_id:1'),
             )
         )
-        pymongo_collection = cls._pymongo(
-            slave_ok_setting=SlaveOkSetting.PRIMARY)
+        # the indexes built by create_indexes, not those of a read route
+        pymongo_collection = cls._pymongo()
         pymongo_indexes = pymongo_collection.index_information()
         exist_indexes = set([
             TaggedIndex.parse_from_pymongo_index_def(index_name, index_def)
@@ -193,17 +228,21 @@ class BaseMixin(object):
                 extra_opts['expireAfterSeconds'] = index.expire_after_seconds
             if index.partial_filter_expression is not None:
                 extra_opts['partialFilterExpression'] = index.partial_filter_expression
-            pymongo_collection.create_index(
-                index.to_pymongo_keys(),
-                background=True,
-                unique=index.unique,
-                sparse=index.sparse, **extra_opts)
+            with log_slow_event('create_index', cls._meta['collection'],
+                                index.to_pymongo_keys()):
+                pymongo_collection.create_index(
+                    index.to_pymongo_keys(),
+                    background=True,
+                    unique=index.unique,
+                    sparse=index.sparse, **extra_opts)
             print('Index built in background, please check that after a while')
 
     @classmethod
     def drop_index(cls, index_name):
-        pymongo_collection = cls._pymongo()
-        pymongo_collection.drop_index(index_name)
+        with log_slow_event('drop_index', cls._meta['collection'],
+                            index_name):
+            pymongo_collection = cls._pymongo()
+            pymongo_collection.drop_index(index_name)
 
     @classmethod
     def get_connection(cls):
@@ -1,55 +1,300 @@
 import contextlib
+import contextvars
 import pymongo
+import queue
+import sys
+import threading
 import warnings
-from bson import ObjectId
+import six
+from bson import BSON, ObjectId
 from mongo_driver.errors import BulkOperationError
 from pymongo.write_concern import WriteConcern
 from pymongo.operations import UpdateMany, UpdateOne, DeleteMany, DeleteOne, InsertOne
 from mongo_driver.mixin.base import BaseMixin
+from mongo_driver.timer import log_slow_event
 
 
 class BulkContext(object):
-    def __init__(self, pymongo_collection, ordered, session=None):
+    """Collects bulk write requests and sends them with `bulk_write`.
+
+    Requests are sent when the context is executed, or as soon as `max_ops`
+    requests or about `max_bytes` bytes of BSON are queued. Results of all
+    the flushes are combined in `bulk_api_result`. Ordered contexts raise a
+    BulkOperationError at the first failing flush, unordered ones go on and
+    raise it on execute with the errors of every failed flush.
+
+    With `background`, flushed chunks are written by a background thread
+    while the caller queues the next ones. At most `queue_size` chunks wait
+    for the writer, flushing blocks beyond that (never with 0). Errors of chunks written
+    in the background are raised by a later flush or by execute. Unordered
+    contexts may use several writer `workers`, which write the chunks
+    concurrently over the connection pool.
+
+    Once a chunk is written, the cached copies of the documents of
+    `document_class` are dropped (see `BaseMixin._invalidate_cached`).
+    """
+
+    def __init__(self, pymongo_collection, ordered, session=None,
+                 max_ops=None, max_bytes=None, background=False,
+                 queue_size=2, workers=1, document_class=None):
+        if workers > 1 and (ordered or session is not None):
+            raise ValueError(
+                'Several bulk workers need an unordered bulk without session')
+        if workers > 1 and not background:
+            raise ValueError('Several bulk workers need a background bulk')
         self._ordered = ordered
         self._pymongo_collection = pymongo_collection
         self._requests = []
+        self._requests_bytes = 0
+        self._max_ops = max_ops
+        self._max_bytes = max_bytes
+        self._flushed_count = 0
+        self._bulk_api_result = _empty_bulk_api_result()
+        self._errors = []
+        self._lock = threading.Lock()
+        self._background = background
+        self._queue_size = queue_size
+        self._workers = workers
+        self._writer = None
+        self._document_class = document_class
+        self._session = session
         self._pymongo_session = session and session.pymongo_session
 
+    @property
+    def bulk_api_result(self):
+        return self._bulk_api_result
+
+    def _add_request(self, request, *documents):
+        self._requests.append(request)
+        if self._max_bytes:
+            self._requests_bytes += sum(_bson_size(document)
+                                        for document in documents)
+        if ((self._max_ops and len(self._requests) >= self._max_ops) or
+                (self._max_bytes and self._requests_bytes >= self._max_bytes)):
+            self.flush()
+
     def bulk_update(self, filter, document, upsert, multi):
         if multi:
-            self._requests.append(UpdateMany(filter, document, upsert=upsert))
+            self._add_request(
+                UpdateMany(filter, document, upsert=upsert), filter, document)
         else:
-            self._requests.append(UpdateOne(filter, document, upsert=upsert))
+            self._add_request(
+                UpdateOne(filter, document, upsert=upsert), filter, document)
 
     def bulk_remove(self, filter, multi):
         if multi:
-            self._requests.append(DeleteMany(filter))
+            self._add_request(DeleteMany(filter), filter)
         else:
-            self._requests.append(DeleteOne(filter))
+            self._add_request(DeleteOne(filter), filter)
 
     def bulk_save(self, doc):
-        self._requests.append(InsertOne(doc))
+        self._add_request(InsertOne(doc), doc)
 
-    def execute(self):
-        if len(self._requests) == 0:
+    def flush(self):
+        """Send the queued requests now, or hand them to the background
+        writer.
+        """
+        self._raise_background_exception()
+        if self._ordered and self._errors:
+            raise self._error()
+        requests = self._requests
+        if len(requests) == 0:
+            return
+        offset = self._flushed_count
+        self._requests = []
+        self._requests_bytes = 0
+        self._flushed_count += len(requests)
+        if not self._background:
+            self._write(requests, offset)
+            if self._ordered and self._errors:
+                raise self._error()
+            return
+        if self._writer is None:
+            self._writer = _BulkWriter(
+                self._write, self._queue_size, self._workers)
+        self._writer.submit(requests, offset)
+
+    def _write(self, requests, offset):
+        if self._ordered and self._errors:
+            # ordered bulks skip whatever follows a failed chunk
             return
         try:
-            self._pymongo_result = self._pymongo_collection.bulk_write(
-                self._requests, ordered=self._ordered, session=self._pymongo_session)
+            with log_slow_event('bulk_write', self._pymongo_collection.name,
+                                {'offset': offset, 'requests': len(requests)}):
+                try:
+                    result = self._pymongo_collection.bulk_write(
+                        requests, ordered=self._ordered,
+                        session=self._pymongo_session)
+                finally:
+                    # even failed chunks may have written some documents
+                    if self._document_class is not None:
+                        self._document_class._invalidate_cached(
+                            session=self._session)
         except pymongo.errors.BulkWriteError as e:
-            raise BulkOperationError(e)
+            with self._lock:
+                _merge_bulk_api_result(self._bulk_api_result, e.details, offset)
+                self._errors.append((offset, e))
+        else:
+            with self._lock:
+                self._pymongo_result = result
+                if result.acknowledged:
+                    _merge_bulk_api_result(
+                        self._bulk_api_result, result.bulk_api_result, offset)
+
+    def _error(self):
+        errors = sorted(self._errors, key=lambda error: error[0])
+        return BulkOperationError(errors[0][1], errors)
+
+    def _raise_background_exception(self):
+        if self._writer is not None and self._writer.exc_info:
+            six.reraise(*self._writer.exc_info)
+
+    def close(self):
+        """Wait for the chunks handed to the background writer."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def execute(self):
+        with log_slow_event('bulk_execute', self._pymongo_collection.name,
+                            {'requests': self._flushed_count +
+                             len(self._requests)}):
+            try:
+                self.flush()
+            finally:
+                writer = self._writer
+                self.close()
+        if self._workers > 1:
+            # chunks complete in any order
+            for key in ('upserted', 'writeErrors'):
+                self._bulk_api_result[key].sort(key=lambda item: item['index'])
+        if writer is not None and writer.exc_info:
+            six.reraise(*writer.exc_info)
+        if self._errors:
+            raise self._error()
+
+
+class _BulkWriter(object):
+    """Background threads writing the chunks flushed by a BulkContext, in
+    a copy of the context of the caller (e.g. its identity map).
+    """
+
+    def __init__(self, write, queue_size, workers=1):
+        self._write = write
+        self._queue = queue.Queue(maxsize=queue_size)
+        self.exc_info = None
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(
+                target=contextvars.copy_context().run, args=(self._run, ),
+                name='mongo_driver.bulk_writer-%d' % i)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, requests, offset):
+        self._queue.put((requests, offset))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self.exc_info is not None:
+                continue
+            try:
+                self._write(*item)
+            except Exception:
+                self.exc_info = sys.exc_info()
+
+    def close(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+def _bson_size(document):
+    """BSON size of a request document, pipeline updates are lists."""
+    if isinstance(document, (list, tuple)):
+        return sum(len(BSON.encode(stage)) for stage in document)
+    return len(BSON.encode(document))
+
+
+def _empty_bulk_api_result():
+    return {
+        'writeErrors': [],
+        'writeConcernErrors': [],
+        'nInserted': 0,
+        'nUpserted': 0,
+        'nMatched': 0,
+        'nModified': 0,
+        'nRemoved': 0,
+        'upserted': [],
+    }
+
+
+def _merge_bulk_api_result(result, chunk_result, offset):
+    """Add the `bulk_api_result` of a chunk starting at request `offset` to
+    the combined `result`, shifting the request indexes it reports.
+    """
+    for key in ('nInserted', 'nUpserted', 'nMatched', 'nModified',
+                'nRemoved'):
+        result[key] += chunk_result.get(key, 0)
+    for key in ('upserted', 'writeErrors'):
+        for item in chunk_result.get(key, []):
+            item = dict(item)
+            item['index'] += offset
+            result[key].append(item)
+    result['writeConcernErrors'].extend(
+        chunk_result.get('writeConcernErrors', []))
 
 
 class BulkMixin(BaseMixin):
     @classmethod
     @contextlib.contextmanager
-    def bulk(cls, allow_empty=True, unordered=False, session=None):
+    def bulk(cls, allow_empty=True, unordered=False, session=None,
+             max_ops=None, max_bytes=None, background=False, queue_size=2,
+             workers=1):
+        """Queue bulk writes, sent when the block exits.
+
+        With `max_ops` and/or `max_bytes` the queued requests are flushed in
+        chunks whenever a threshold is reached, chunks already flushed are
+        not rolled back if the block raises afterwards. With `background`
+        the chunks are written by `workers` background threads, see
+        `BulkContext`.
+        """
         pymongo_collection = cls._pymongo()
         bulk_context = BulkContext(
-            pymongo_collection, not unordered, session=session)
-        yield bulk_context
+            pymongo_collection, not unordered, session=session,
+            max_ops=max_ops, max_bytes=max_bytes, background=background,
+            queue_size=queue_size, workers=workers, document_class=cls)
+        try:
+            yield bulk_context
+        except BaseException:
+            bulk_context.close()
+            raise
         bulk_context.execute()
 
+    @classmethod
+    @contextlib.contextmanager
+    def bulk_parallel(cls, workers=4, unordered=True, max_ops=1000,
+                      max_bytes=None, queue_size=None):
+        """Queue bulk writes, flushed every `max_ops` requests and written
+        by `workers` threads at once.
+
+        Only unordered bulks can be written in parallel, the connection
+        pool (`connect(max_pool_size=...)`) should allow `workers` connections.
+        """
+        if not unordered:
+            raise ValueError('Parallel bulks must be unordered')
+        if queue_size is None:
+            queue_size = 2 * workers
+        with cls.bulk(unordered=True, max_ops=max_ops, max_bytes=max_bytes,
+                      background=True, queue_size=queue_size,
+                      workers=workers) as bulk_context:
+            yield bulk_context
+
     @classmethod
     def bulk_update(cls, bulk_context, filter, document, upsert=False, multi=True):
         if not document:
@@ -1,25 +1,136 @@
 import logging
+import queue
+import sys
+import threading
 import traceback
+from collections import OrderedDict
+import base64
+from itertools import islice
 import pymongo
+import six
 import time
-from retry import retry
-from bson import ObjectId
+from bson import BSON, ObjectId
 from pymongo.read_preferences import ReadPreference
-from mongo_driver.mixin.base import BaseMixin, RETRY_ERRORS,\
-    RETRY_LOGGER
-from mongo_driver.timer import log_slow_event
+from mongo_driver.mixin.base import BaseMixin
+from mongo_driver.mixin.scan_mixin import ScanMixin
+from mongo_driver.retry_policy import retryable
+from mongo_driver.errors import InvalidQueryError
+from mongo_driver.identity import get_identity_map
+from mongo_driver.cache import get_document_cache
+from mongo_driver.timer import log_slow_event, record_event, TimedCursor, \
+    document_bytes
 from mongo_driver import SlaveOkSetting
 
 
-class ReadMixin(BaseMixin):
+def _prefetch_iter(cur, convert, prefetch, chunk_size):
+    """Yield `convert(doc)` for the documents of `cur`, read and converted
+    by a background thread that keeps up to about `prefetch` documents
+    ahead. They are passed over in chunks of `chunk_size`.
+    """
+    chunks = queue.Queue(maxsize=max(1, prefetch // chunk_size))
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            chunk = []
+            for doc in cur:
+                chunk.append(convert(doc))
+                if len(chunk) >= chunk_size:
+                    if not put((chunk, None)):
+                        return
+                    chunk = []
+            if chunk and not put((chunk, None)):
+                return
+            put((None, None))
+        except BaseException:
+            put((None, sys.exc_info()))
+        finally:
+            cur.close()
+
+    thread = threading.Thread(target=produce, name='mongo_driver.prefetch')
+    thread.daemon = True
+    thread.start()
+    try:
+        while True:
+            chunk, exc_info = chunks.get()
+            if exc_info is not None:
+                six.reraise(*exc_info)
+            if chunk is None:
+                return
+            for doc in chunk:
+                yield doc
+    finally:
+        stop.set()
+        thread.join()
+
+
+# unique index key sets per document class, see ReadMixin._unique_key_sets
+_unique_key_sets = {}
+
+
+def _column_kind(field):
+    from mongo_driver.fields import IntField, FloatField, BooleanField, \
+        DateTimeField
+    if isinstance(field, IntField):
+        return 'int'
+    if isinstance(field, FloatField):
+        return 'float'
+    if isinstance(field, BooleanField):
+        return 'bool'
+    if isinstance(field, DateTimeField):
+        return 'datetime'
+    return 'object'
+
+
+def _is_integral(value):
+    if isinstance(value, float):
+        return value.is_integer()
+    return isinstance(value, six.integer_types)
+
+
+def _column_chunk(numpy, kind, values):
+    """Array of a batch of raw `values` of one field. Missing ints and
+    floats become NaN and missing dates NaT; ints are stored as floats
+    when some are missing or not integral. Columns of booleans with
+    missing values, and of numbers with values of other types, are object
+    arrays.
+    """
+    if kind in ('int', 'float'):
+        if kind == 'int' and all(_is_integral(value) for value in values):
+            return numpy.array(values, dtype=numpy.int64)
+        if all(value is None or isinstance(value, (float, six.integer_types))
+               for value in values):
+            return numpy.array([numpy.nan if value is None else value
+                                for value in values], dtype=numpy.float64)
+    if kind == 'bool' and None not in values:
+        return numpy.array(values, dtype=numpy.bool_)
+    if kind == 'datetime':
+        return numpy.array(values, dtype='datetime64[ms]')
+    chunk = numpy.empty(len(values), dtype=object)
+    chunk[:] = values
+    return chunk
+
+
+class ReadMixin(ScanMixin, BaseMixin):
     MAX_TIME_MS = 5000
     FIND_WARNING_DOCS_LIMIT = 10000
+    PREFETCH_CHUNK_SIZE = 100
 
     @classmethod
     def _count(cls, slave_ok=SlaveOkSetting.PRIMARY, filter={},
                hint=None, limit=None, skip=0, max_time_ms=None, session=None):
         filter = cls._update_filter(filter)
-        pymongo_collection = cls._pymongo(slave_ok_setting=slave_ok)
+        pymongo_collection = cls._pymongo(slave_ok_setting=slave_ok,
+                                          session=session)
         max_time_ms = max_time_ms or cls.MAX_TIME_MS
         cls._check_read_max_time_ms(
             'count_documents', max_time_ms, pymongo_collection.read_preference)
@@ -45,51 +156,138 @@ class ReadMixin(BaseMixin):
                 })
             return pymongo_collection.count_documents(filter, **kwargs_dict)
 
+    @classmethod
+    def _son_converter(cls, raw=False):
+        """Return the function turning documents returned by pymongo into
+        results: `_from_son` by default, or with `raw` a function that only
+        renames db fields to field names and returns the pymongo dict.
+        """
+        if not raw:
+            return cls._from_son
+        renames = [(db_field, field_name) for field_name, db_field
+                   in cls._db_field_map.items() if field_name != db_field]
+
+        def rename(son):
+            for db_field, field_name in renames:
+                if db_field in son:
+                    son[field_name] = son.pop(db_field)
+            return son
+        return rename
+
+    @classmethod
+    def _filter_id(cls, filter):
+        """The id of a filter on a single `_id` value, or None."""
+        if not isinstance(filter, dict) or len(filter) != 1:
+            return None
+        doc_id = filter.get('_id', filter.get('id'))
+        if isinstance(doc_id, dict):
+            return None
+        return doc_id
+
+    @classmethod
+    def _unique_key_sets(cls):
+        """Sets of the db fields of the unique indexes, `_id` included."""
+        from mongo_driver import IndexDefinition
+        key_sets = _unique_key_sets.get(cls)
+        if key_sets is None:
+            key_sets = {frozenset(['_id'])}
+            for index_def in cls._meta['indexes']:
+                if isinstance(index_def, dict) and 'keys' in index_def:
+                    index_def = IndexDefinition.parse_from_keys_str(
+                        index_def['keys'], **index_def)
+                if isinstance(index_def, IndexDefinition) and \
+                        index_def.unique:
+                    key_sets.add(frozenset(index_def.keys))
+            _unique_key_sets[cls] = key_sets
+        return key_sets
+
+    @classmethod
+    def _read_cache(cls, projection=None, sort=None, session=None):
+        """The read-through cache of the class, see `meta['cache']`, when
+        it can serve a read: whole documents, no sort, no session.
+        """
+        if projection is not None or sort is not None or \
+                session is not None or cls._meta.get('allow_inheritance'):
+            return None
+        return get_document_cache(cls)
+
+    @classmethod
+    def _cache_key(cls, filter):
+        """Cache key of a filter matching single values of all the fields
+        of a unique index, or None.
+        """
+        if not isinstance(filter, dict) or not filter:
+            return None
+        items = []
+        for key, value in filter.items():
+            key = cls._db_field_map.get(key, key)
+            if key.startswith('$') or isinstance(value, (dict, list)):
+                return None
+            items.append((key, value))
+        if frozenset(key for key, _ in items) not in cls._unique_key_sets():
+            return None
+        cache_key = tuple(sorted(items, key=lambda item: item[0]))
+        try:
+            hash(cache_key)
+        except TypeError:
+            return None
+        return cache_key
+
     @classmethod
     def _find_raw(cls, filter, projection=None, skip=0, limit=0, sort=None,
                   slave_ok=SlaveOkSetting.PRIMARY, find_one=False, hint=None,
                   batch_size=10000, max_time_ms=None, session=None):
         # transform query
         filter = cls._update_filter(filter)
-        with log_slow_event('find', cls._meta['collection'], filter):
-            pymongo_collection = cls._pymongo(slave_ok_setting=slave_ok)
-            cur = pymongo_collection.find(filter, projection,
-                                          skip=skip, limit=limit,
-                                          sort=sort,
-                                          session=session and session.pymongo_session)
+        # the cursor records the event once it has been iterated
+        start_time = time.perf_counter_ns()
+        pymongo_collection = cls._pymongo(slave_ok_setting=slave_ok,
+                                          session=session)
+        cur = pymongo_collection.find(filter, projection,
+                                      skip=skip, limit=limit,
+                                      sort=sort,
+                                      session=session and session.pymongo_session)
 
-            max_time_ms = max_time_ms or cls.MAX_TIME_MS
-            cls._check_read_max_time_ms(
-                'find', max_time_ms, pymongo_collection.read_preference)
+        max_time_ms = max_time_ms or cls.MAX_TIME_MS
+        cls._check_read_max_time_ms(
+            'find', max_time_ms, pymongo_collection.read_preference)
 
-            if max_time_ms > 0:
-                cur.max_time_ms(max_time_ms)
+        if max_time_ms > 0:
+            cur.max_time_ms(max_time_ms)
 
-            if hint:
-                cur.hint(hint)
+        if hint:
+            cur.hint(hint)
 
-            if find_one:
-                for result in cur.limit(1):
-                    return result
-                return None
-            else:
-                cur.batch_size(batch_size)
+        if find_one:
+            result = None
+            for result in cur.limit(1):
+                break
+            record_event('find', cls._meta['collection'], filter,
+                         time.perf_counter_ns() - start_time,
+                         documents=int(result is not None),
+                         bytes=document_bytes(result))
+            return result
+        else:
+            cur.batch_size(batch_size)
 
-            return cur
+        return TimedCursor(cur, 'find', cls._meta['collection'], filter,
+                           start_time=start_time)
 
     @classmethod
-    @retry(exceptions=RETRY_ERRORS, tries=5, delay=5, logger=RETRY_LOGGER)
+    @retryable
     def find(cls, filter, projection=None, skip=0, limit=0, sort=None,
-             slave_ok=SlaveOkSetting.PRIMARY, max_time_ms=None, session=None):
+             slave_ok=SlaveOkSetting.PRIMARY, max_time_ms=None, session=None,
+             raw=False):
         cur = cls._find_raw(filter, projection=projection, skip=skip,
                             limit=limit, sort=sort,
                             slave_ok=slave_ok,
                             max_time_ms=max_time_ms, session=session)
+        convert = cls._son_converter(raw)
         results = []
         total = 0
         for doc in cur:
             total += 1
-            results.append(cls._from_son(doc))
+            results.append(convert(doc))
             if total == cls.FIND_WARNING_DOCS_LIMIT + 1:
                 logging.getLogger('mongo_driver.read.find_warning').warn(
                     'Collection %s: return more than %d docs in one FIND action, '
@@ -102,73 +300,333 @@ class ReadMixin(BaseMixin):
     @classmethod
     def find_iter(cls, filter, projection=None, skip=0, limit=0, sort=None,
                   slave_ok=SlaveOkSetting.PRIMARY, batch_size=10000, max_time_ms=None,
-                  session=None):
+                  session=None, raw=False, prefetch=0):
+        """Iterate the documents matching `filter`.
+
+        With `prefetch`, a background thread fetches and hydrates up to
+        about `prefetch` documents ahead of the caller, so that getMore
+        round trips overlap with the processing of the current documents.
+        """
         cur = cls._find_raw(filter, projection=projection, skip=skip,
                             limit=limit, sort=sort, slave_ok=slave_ok,
                             batch_size=batch_size, max_time_ms=max_time_ms,
                             session=session)
+        convert = cls._son_converter(raw)
+        if prefetch > 0:
+            yield from _prefetch_iter(
+                cur, convert, prefetch, min(prefetch, cls.PREFETCH_CHUNK_SIZE))
+            return
         last_doc = None
-        for doc in cur:
-            last_doc = cls._from_son(doc)
-            yield last_doc
+        try:
+            for doc in cur:
+                last_doc = convert(doc)
+                yield last_doc
+        finally:
+            cur.close()
+
+    @classmethod
+    def find_batches(cls, filter, projection=None, skip=0, limit=0, sort=None,
+                     slave_ok=SlaveOkSetting.PRIMARY, batch_size=1000,
+                     max_time_ms=None, session=None, raw=False):
+        """Iterate the documents matching `filter` as lists of up to
+        `batch_size` documents, the batch size asked to the server.
+        """
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        cur = cls._find_raw(filter, projection=projection, skip=skip,
+                            limit=limit, sort=sort, slave_ok=slave_ok,
+                            batch_size=batch_size, max_time_ms=max_time_ms,
+                            session=session)
+        convert = cls._son_converter(raw)
+        try:
+            while True:
+                batch = [convert(doc) for doc in islice(cur, batch_size)]
+                if not batch:
+                    return
+                yield batch
+        finally:
+            cur.close()
+
+    @classmethod
+    def find_columns(cls, filter, fields, skip=0, limit=0, sort=None,
+                     slave_ok=SlaveOkSetting.PRIMARY, batch_size=10000,
+                     max_time_ms=None, session=None):
+        """Read `fields` of the documents matching `filter` into a dict of
+        NumPy arrays, without hydrating documents.
+
+        Int, float, boolean and datetime fields give int64, float64, bool
+        and datetime64[ms] arrays, see `_column_chunk` for missing values,
+        other fields give object arrays of the values as stored.
+        """
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError('You need numpy installed to read columns')
+        columns = []
+        for field_name in fields:
+            field = cls._fields.get(field_name)
+            if field is None:
+                raise ValueError('Unknown field %s for collection %s' % (
+                    field_name, cls.__name__))
+            columns.append((field_name,
+                            cls._db_field_map.get(field_name, field_name),
+                            _column_kind(field)))
+        projection = dict((db_field, True) for _, db_field, _ in columns)
+        if '_id' not in projection:
+            projection['_id'] = False
+        cur = cls._find_raw(filter, projection=projection, skip=skip,
+                            limit=limit, sort=sort, slave_ok=slave_ok,
+                            batch_size=batch_size, max_time_ms=max_time_ms,
+                            session=session)
+        chunks = dict((field_name, []) for field_name in fields)
+        try:
+            while True:
+                batch = list(islice(cur, batch_size))
+                if not batch:
+                    break
+                for field_name, db_field, kind in columns:
+                    chunks[field_name].append(_column_chunk(
+                        numpy, kind, [son.get(db_field) for son in batch]))
+        finally:
+            cur.close()
+        result = {}
+        for field_name, _, kind in columns:
+            if chunks[field_name]:
+                result[field_name] = numpy.concatenate(chunks[field_name])
+            else:
+                result[field_name] = _column_chunk(numpy, kind, [])
+        return result
+
+    @classmethod
+    def _paginate_sort(cls, sort, check_index=True):
+        """Sort keys of a pagination, with `_id` appended to break ties
+        unless the sort covers a whole unique index. With `check_index`,
+        the sort must be a prefix of a declared index, in the order of the
+        index or the reverse.
+        """
+        from mongo_driver import IndexDefinition
+        sort = [(cls._db_field_map.get(key, key), direction)
+                for key, direction in sort]
+        indexes = [IndexDefinition.parse_from_keys_str('_id:1', unique=True)]
+        for index_def in cls._meta['indexes']:
+            if isinstance(index_def, dict) and 'keys' in index_def:
+                index_def = IndexDefinition.parse_from_keys_str(
+                    index_def['keys'], **index_def)
+            if isinstance(index_def, IndexDefinition):
+                indexes.append(index_def)
+        unique = False
+        matched = not check_index
+        for index_def in indexes:
+            index_keys = list(index_def.keys.items())[:len(sort)]
+            reverse = [(key, -direction) for key, direction in index_keys
+                       if direction in (1, -1)]
+            if index_keys == sort or reverse == sort:
+                matched = True
+                unique = unique or (index_def.unique and
+                                    len(index_def.keys) == len(sort))
+        if not matched:
+            raise InvalidQueryError(
+                'Collection %s: no index for paginating on %s' % (
+                    cls.__name__, sort))
+        if not unique and '_id' not in dict(sort):
+            sort.append(('_id', sort[-1][1] if sort else 1))
+        return sort
+
+    @classmethod
+    def paginate(cls, filter, sort, page_size=100, after=None,
+                 projection=None, slave_ok=SlaveOkSetting.PRIMARY,
+                 max_time_ms=None, session=None, raw=False,
+                 check_index=True):
+        """Return a page of the documents matching `filter` in `sort`
+        order and the token of the next page, None after the last page.
+
+        Pages start after the sort key values of the last document of the
+        previous page, given by the `after` token, instead of skipping the
+        documents before them. Sort keys should not be null or missing.
+        """
+        sort = cls._paginate_sort(sort, check_index=check_index)
+        keys = [key for key, _ in sort]
+        filter = cls._update_filter(filter)
+        if after is not None:
+            state = BSON(base64.urlsafe_b64decode(after)).decode()
+            if state['k'] != keys:
+                raise ValueError('Pagination token of another sort')
+            ranges = []
+            for i, (key, direction) in enumerate(sort):
+                condition = dict(zip(keys[:i], state['v'][:i]))
+                condition[key] = {
+                    '$gt' if direction == 1 else '$lt': state['v'][i]}
+                ranges.append(condition)
+            filter = {'$and': [filter, {'$or': ranges}]}
+        if isinstance(projection, dict) and any(projection.values()):
+            projection = dict(projection, **dict((key, True) for key in keys))
+        elif isinstance(projection, (list, tuple)):
+            projection = list(projection) + keys
+        cur = cls._find_raw(filter, projection=projection, sort=sort,
+                            limit=page_size + 1, slave_ok=slave_ok,
+                            max_time_ms=max_time_ms, session=session)
+        sons = list(cur)
+        token = None
+        if len(sons) > page_size:
+            sons = sons[:page_size]
+            values = []
+            for key in keys:
+                value = sons[-1]
+                for part in key.split('.'):
+                    value = value.get(part) if isinstance(value, dict) \
+                        else None
+                values.append(value)
+            token = base64.urlsafe_b64encode(
+                BSON.encode({'k': keys, 'v': values})).decode('ascii')
+        convert = cls._son_converter(raw)
+        return [convert(son) for son in sons], token
+
+    @classmethod
+    def q(cls, filter, **kwargs):
+        """A deferred `find`, turned into a `find_one` or `count` by
+        `.one()` and `.count()`, to run with `mongo_driver.gather`.
+        """
+        from mongo_driver.query import Query
+        return Query(cls, 'find', (filter, ), kwargs)
 
     @classmethod
     def aggregate(cls, pipeline=None, slave_ok=SlaveOkSetting.OFFLINE,
                   session=None):
         # TODO max_time_ms: timeout control needed
         read_preference = SlaveOkSetting.TO_PYMONGO[slave_ok]
-        pymongo_collection = cls._pymongo(slave_ok_setting=slave_ok)
-        cursor_iter = pymongo_collection.aggregate(pipeline,
-                                                   session=session and session.pymongo_session)
-        for doc in cursor_iter:
-            yield doc
+        start_time = time.perf_counter_ns()
+        pymongo_collection = cls._pymongo(slave_ok_setting=slave_ok,
+                                          session=session)
+        cursor_iter = TimedCursor(
+            pymongo_collection.aggregate(pipeline,
+                                         session=session and session.pymongo_session),
+            'aggregate', cls._meta['collection'], pipeline,
+            start_time=start_time)
+        try:
+            for doc in cursor_iter:
+                yield doc
+        finally:
+            cursor_iter.close()
 
     @classmethod
-    @retry(exceptions=RETRY_ERRORS, tries=5, delay=5, logger=RETRY_LOGGER)
+    @retryable
     def distinct(cls, filter, key, skip=0, limit=0, sort=None,
                  slave_ok=SlaveOkSetting.PRIMARY, max_time_ms=None, session=None):
-        cur = cls._find_raw(filter, skip=skip, limit=limit,
-                            sort=sort, slave_ok=slave_ok,
-                            max_time_ms=max_time_ms, session=session)
-        return cur.distinct(key)
+        with log_slow_event('distinct', cls._meta['collection'], filter):
+            cur = cls._find_raw(filter, skip=skip, limit=limit,
+                                sort=sort, slave_ok=slave_ok,
+                                max_time_ms=max_time_ms, session=session)
+            return cur.cursor.distinct(key)
 
     @classmethod
-    @retry(exceptions=RETRY_ERRORS, tries=5, delay=5, logger=RETRY_LOGGER)
+    @retryable
     def find_one(cls, filter, projection=None, sort=None, slave_ok=SlaveOkSetting.PRIMARY,
-                 max_time_ms=None, session=None):
-        doc = cls._find_raw(filter, projection=projection, sort=sort,
-                            slave_ok=slave_ok, find_one=True,
-                            max_time_ms=max_time_ms, session=session)
-        if doc:
-            return cls._from_son(doc)
+                 max_time_ms=None, session=None, raw=False):
+        id_map = None
+        if projection is None and not raw:
+            id_map = get_identity_map(session)
+        doc_id = None
+        if id_map is not None:
+            doc_id = cls._filter_id(filter)
+            if doc_id is not None:
+                doc = id_map.get(cls, doc_id)
+                if doc is not None:
+                    return doc
+        cache = cls._read_cache(projection=projection, sort=sort,
+                                session=session)
+        cache_key = cache is not None and cls._cache_key(filter)
+        son = cache.get(cache_key) if cache_key else None
+        if son is None:
+            son = cls._find_raw(filter, projection=projection, sort=sort,
+                                slave_ok=slave_ok, find_one=True,
+                                max_time_ms=max_time_ms, session=session)
+            if son and cache_key:
+                cache.set(cache_key, son)
+        if son:
+            doc = cls._son_converter(raw)(son)
+            if doc_id is not None:
+                id_map.add(doc)
+            return doc
         else:
             return None
 
     @classmethod
-    @retry(exceptions=RETRY_ERRORS, tries=5, delay=5, logger=RETRY_LOGGER)
+    @retryable
     def count(cls, filter={}, slave_ok=SlaveOkSetting.PRIMARY, max_time_ms=None,
               skip=0, limit=0, hint=None, session=None):
         return cls._count(filter=filter, slave_ok=slave_ok,
                           max_time_ms=max_time_ms,
                           hint=hint, skip=skip, limit=limit, session=session)
 
-    @retry(exceptions=RETRY_ERRORS, tries=5, delay=5, logger=RETRY_LOGGER)
+    @retryable
     def reload(self, slave_ok=SlaveOkSetting.PRIMARY, session=None):
-        obj = self.__class__.find_one(self._by_id_key(self.id),
-                                      slave_ok=slave_ok, session=session)
+        cls = self.__class__
+        # always read the database, the identity map may hold self and the
+        # read-through cache an older copy, which is refreshed
+        son = cls._find_raw(self._by_id_key(self.id), slave_ok=slave_ok,
+                            find_one=True, session=session)
+        cache = cls._read_cache(session=session)
+        if son and cache is not None:
+            cache.set((('_id', son['_id']),), son)
+        obj = son and cls._from_son(son)
         if obj:
             for field in self._fields:
                 setattr(self, field, obj[field])
 
     @classmethod
-    @retry(exceptions=RETRY_ERRORS, tries=5, delay=5, logger=RETRY_LOGGER)
+    @retryable
     def by_id(cls, doc_id, **kwargs):
         if isinstance(doc_id, str):
             doc_id = ObjectId(doc_id)
         return cls.find_one(cls._by_id_key(doc_id), **kwargs)
 
     @classmethod
-    @retry(exceptions=RETRY_ERRORS, tries=5, delay=5, logger=RETRY_LOGGER)
+    @retryable
     def by_ids(cls, doc_ids, **kwargs):
         new_doc_ids = [ObjectId(doc_id) for doc_id in doc_ids]
-        return cls.find(cls._by_ids_key(new_doc_ids), **kwargs)
+        id_map = None
+        # sorted or paged reads go to the database
+        if kwargs.get('projection') is None and not kwargs.get('raw') and \
+                not any(kwargs.get(key) for key in ('sort', 'skip', 'limit')):
+            id_map = get_identity_map(kwargs.get('session'))
+        cache = None
+        if set(kwargs) <= {'slave_ok', 'max_time_ms', 'raw'}:
+            cache = cls._read_cache()
+        if id_map is None and cache is None:
+            return cls.find(cls._by_ids_key(new_doc_ids), **kwargs)
+        # only read the documents missing from the identity map and cache
+        convert = cls._son_converter(kwargs.get('raw', False))
+        docs = []
+        missing = []
+        for doc_id in OrderedDict.fromkeys(new_doc_ids):
+            doc = id_map.get(cls, doc_id) if id_map is not None else None
+            if doc is None and cache is not None:
+                son = cache.get((('_id', doc_id),))
+                if son is not None:
+                    doc = convert(son)
+                    if id_map is not None:
+                        id_map.add(doc)
+            if doc is None:
+                missing.append(doc_id)
+            else:
+                docs.append(doc)
+        if not missing:
+            return docs
+        if cache is None:
+            fetched = cls.find(cls._by_ids_key(missing), **kwargs)
+        else:
+            cur = cls._find_raw(
+                cls._by_ids_key(missing),
+                slave_ok=kwargs.get('slave_ok', SlaveOkSetting.PRIMARY),
+                max_time_ms=kwargs.get('max_time_ms'))
+            fetched = []
+            for son in cur:
+                cache.set((('_id', son['_id']),), son)
+                fetched.append(convert(son))
+        for doc in fetched:
+            if id_map is not None:
+                id_map.add(doc)
+            docs.append(doc)
+        return docs
@@ -0,0 +1,235 @@
+import queue
+import sys
+import threading
+import six
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from bson import ObjectId, Binary, Regex, Timestamp, MinKey, MaxKey
+from bson.decimal128 import Decimal128
+from mongo_driver.mixin.base import BaseMixin
+from mongo_driver import SlaveOkSetting
+
+# values sampled per partition when splitting a range with $sample
+SAMPLES_PER_PARTITION = 32
+
+
+def _bson_order(value):
+    """Rank of the type of `value` in the BSON comparison order, values of
+    different ranks are never matched by the same range query.
+    """
+    if isinstance(value, MinKey):
+        return 1
+    if value is None:
+        return 2
+    if isinstance(value, bool):
+        return 9
+    if isinstance(value, (six.integer_types, float, Decimal128)):
+        return 3
+    if isinstance(value, six.string_types):
+        return 4
+    if isinstance(value, dict):
+        return 5
+    if isinstance(value, (list, tuple)):
+        return 6
+    if isinstance(value, (Binary, bytes)):
+        return 7
+    if isinstance(value, ObjectId):
+        return 8
+    if isinstance(value, datetime):
+        return 10
+    if isinstance(value, Timestamp):
+        return 11
+    if isinstance(value, Regex):
+        return 12
+    if isinstance(value, MaxKey):
+        return 13
+    return 14
+
+
+def _interpolate(lower, upper, partitions):
+    """Evenly spaced split values between `lower` and `upper`, or None for
+    types that cannot be interpolated.
+    """
+    if isinstance(lower, ObjectId) and isinstance(upper, ObjectId):
+        # ObjectIds are spread by their creation time
+        splits = _interpolate(lower.generation_time, upper.generation_time,
+                              partitions)
+        return [ObjectId.from_datetime(split) for split in splits]
+    if isinstance(lower, datetime) and isinstance(upper, datetime):
+        return [lower + (upper - lower) * i / partitions
+                for i in range(1, partitions)]
+    if (isinstance(lower, six.integer_types) and
+            isinstance(upper, six.integer_types) and
+            not isinstance(lower, bool) and not isinstance(upper, bool)):
+        return [lower + (upper - lower) * i // partitions
+                for i in range(1, partitions)]
+    if (isinstance(lower, (float, six.integer_types)) and
+            isinstance(upper, (float, six.integer_types))):
+        return [lower + (upper - lower) * i / float(partitions)
+                for i in range(1, partitions)]
+    return None
+
+
+class ScanMixin(BaseMixin):
+    @classmethod
+    def _scan_splits(cls, filter, key, partitions, slave_ok, sample=False):
+        """Values splitting the `key` range of the documents matching
+        `filter` into `partitions`, interpolated between the min and max
+        values or, with `sample` or keys that cannot be interpolated, taken
+        from a $sample of the documents. Null and missing values are left
+        out. None for empty ranges, no split when the values have types
+        ordered differently in BSON, as a range only matches one of them.
+        """
+        pymongo_collection = cls._pymongo(slave_ok_setting=slave_ok)
+        filter = {'$and': [filter, {key: {'$ne': None}}]}
+        lower = pymongo_collection.find_one(
+            filter, {key: True}, sort=[(key, 1)])
+        if lower is None:
+            return None
+        upper = pymongo_collection.find_one(
+            filter, {key: True}, sort=[(key, -1)])
+        if _bson_order(lower[key]) != _bson_order(upper[key]):
+            return []
+        splits = None
+        if not sample:
+            splits = _interpolate(lower[key], upper[key], partitions)
+        if splits is None:
+            values = sorted((
+                doc[key] for doc in pymongo_collection.aggregate([
+                    {'$match': filter},
+                    {'$sample': {'size': partitions * SAMPLES_PER_PARTITION}},
+                    {'$project': {key: True}},
+                ]) if doc.get(key) is not None),
+                key=lambda value: (_bson_order(value), value))
+            splits = [values[len(values) * i // partitions]
+                      for i in range(1, partitions)] if values else []
+        result = []
+        for split in splits:
+            if split > lower[key] and split not in result:
+                result.append(split)
+        return result
+
+    @classmethod
+    def parallel_scan(cls, filter, partitions=4, workers=4, key='_id',
+                      projection=None, slave_ok=SlaveOkSetting.PRIMARY,
+                      batch_size=1000, max_time_ms=None, raw=False,
+                      sample=False, checkpoint=None):
+        """Iterate the documents matching `filter`, read by `workers`
+        threads scanning `partitions` ranges of `key` at once.
+
+        The ranges are split between the min and max values of `key` (see
+        `_scan_splits`), which should be indexed and unique. Documents with
+        a null or missing `key` are read by one more partition, in `_id`
+        order. Documents come in key order within a partition, in no
+        particular order overall.
+
+        `checkpoint` is a dict filled with the ranges and the last key
+        handed out in each of them, updated when the caller asks for the
+        next document. Passing it again, e.g. after a failure, resumes the
+        scan where it stopped; it only holds BSON values.
+        """
+        key = cls._db_field_map.get(key, key)
+        filter = cls._update_filter(filter)
+        # keys are needed for the checkpoint
+        if isinstance(projection, dict) and any(projection.values()):
+            projection = dict(projection, **{key: True, '_id': True})
+        elif isinstance(projection, (list, tuple)):
+            projection = list(projection) + [key, '_id']
+        if checkpoint is None:
+            checkpoint = {}
+        if 'partitions' not in checkpoint:
+            splits = cls._scan_splits(filter, key, partitions, slave_ok,
+                                      sample=sample)
+            bounds = [None] + (splits or []) + [None]
+            checkpoint['key'] = key
+            checkpoint['partitions'] = [{
+                'lower': lower,
+                'upper': upper,
+                'last': None,
+                'done': splits is None,
+            } for lower, upper in zip(bounds[:-1], bounds[1:])]
+            # null and missing keys fall outside of every range
+            checkpoint['partitions'].append({
+                'lower': None,
+                'upper': None,
+                'last': None,
+                'done': False,
+                'null': True,
+            })
+        elif checkpoint['key'] != key:
+            raise ValueError('Checkpoint of a scan on %s' % checkpoint['key'])
+        pending = [index for index, partition
+                   in enumerate(checkpoint['partitions'])
+                   if not partition['done']]
+        if not pending:
+            return
+        convert = cls._son_converter(raw)
+        items = queue.Queue(maxsize=workers * 2)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    items.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def scan(index):
+            if stop.is_set():
+                return
+            partition = checkpoint['partitions'][index]
+            if partition.get('null'):
+                order_key = '_id'
+                conditions = [{key: None}]
+                if partition['last'] is not None:
+                    conditions.append({'_id': {'$gt': partition['last']}})
+            else:
+                order_key = key
+                condition = {}
+                if partition['last'] is not None:
+                    condition['$gt'] = partition['last']
+                elif partition['lower'] is not None:
+                    condition['$gte'] = partition['lower']
+                else:
+                    condition['$ne'] = None
+                if partition['upper'] is not None:
+                    condition['$lt'] = partition['upper']
+                conditions = [{key: condition}]
+            partition_filter = {'$and': [filter] + conditions}
+            try:
+                cur = cls._find_raw(partition_filter, projection=projection,
+                                    sort=[(order_key, 1)], slave_ok=slave_ok,
+                                    batch_size=batch_size,
+                                    max_time_ms=max_time_ms)
+                try:
+                    for son in cur:
+                        if not put((index, son.get(order_key), convert(son),
+                                    None)):
+                            return
+                finally:
+                    cur.close()
+                put((index, None, None, None))
+            except BaseException:
+                put((index, None, None, sys.exc_info()))
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            for index in pending:
+                executor.submit(scan, index)
+            remaining = len(pending)
+            while remaining:
+                index, value, doc, exc_info = items.get()
+                partition = checkpoint['partitions'][index]
+                if exc_info is not None:
+                    six.reraise(*exc_info)
+                if doc is None:
+                    partition['done'] = True
+                    remaining -= 1
+                    continue
+                yield doc
+                partition['last'] = value
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
@@ -13,23 +13,29 @@ from mongo_driver.session import Session
 class WriteMixin(BulkMixin, BaseMixin):
     @classmethod
     def drop_collection(cls):
-        pymongo_collection = cls._pymongo()
-        pymongo_collection.drop()
+        with log_slow_event("drop_collection", cls._meta['collection'], {}):
+            pymongo_collection = cls._pymongo()
+            pymongo_collection.drop()
+        cls._invalidate_cached()
 
     @classmethod
     def update(cls, filter, document, upsert=False, multi=True, session=None):
         document = cls._transform_value(document)
         filter = cls._update_filter(filter)
-        with log_slow_event("update", cls._meta['collection'], filter):
-            pymongo_collection = cls._pymongo()
-            if multi:
-                result = pymongo_collection.update_many(
-                    filter, document, upsert=upsert,
-                    session=session and session.pymongo_session)
-            else:
-                result = pymongo_collection.update_one(
-                    filter, document, upsert=upsert,
-                    session=session and session.pymongo_session)
+        try:
+            with log_slow_event("update", cls._meta['collection'], filter):
+                pymongo_collection = cls._pymongo()
+                if multi:
+                    result = pymongo_collection.update_many(
+                        filter, document, upsert=upsert,
+                        session=session and session.pymongo_session)
+                else:
+                    result = pymongo_collection.update_one(
+                        filter, document, upsert=upsert,
+                        session=session and session.pymongo_session)
+        finally:
+            # after the write, reads in between would cache the old values
+            cls._invalidate_cached(session=session)
         result_dict = {
             'matched_count': result.matched_count,
             'modified_count': result.modified_count,
@@ -47,25 +53,29 @@ class WriteMixin(BulkMixin, BaseMixin):
         filter = cls._update_filter(filter)
         update = cls._transform_value(update)
         from pymongo.collection import ReturnDocument
-        with log_slow_event("find_and_modify", cls._meta['collection'], filter):
-            pymongo_collection = cls._pymongo()
-            if remove:
-                result = pymongo_collection.find_one_and_delete(
-                    filter,
-                    sort=sort,
-                    projection=projection,
-                    session=session and session.pymongo_session
-                )
-            else:
-                result = pymongo_collection.find_one_and_update(
-                    filter, update,
-                    sort=sort,
-                    projection=projection,
-                    upsert=upsert,
-                    return_document=ReturnDocument.AFTER if new else
-                    ReturnDocument.BEFORE,
-                    session=session and session.pymongo_session
-                )
+        try:
+            with log_slow_event("find_and_modify", cls._meta['collection'],
+                                filter):
+                pymongo_collection = cls._pymongo()
+                if remove:
+                    result = pymongo_collection.find_one_and_delete(
+                        filter,
+                        sort=sort,
+                        projection=projection,
+                        session=session and session.pymongo_session
+                    )
+                else:
+                    result = pymongo_collection.find_one_and_update(
+                        filter, update,
+                        sort=sort,
+                        projection=projection,
+                        upsert=upsert,
+                        return_document=ReturnDocument.AFTER if new else
+                        ReturnDocument.BEFORE,
+                        session=session and session.pymongo_session
+                    )
+        finally:
+            cls._invalidate_cached(session=session)
         if result:
             return cls._from_son(result)
         else:
@@ -74,38 +84,86 @@ class WriteMixin(BulkMixin, BaseMixin):
     @classmethod
     def remove(cls, filter, multi=True, session=None):
         filter = cls._update_filter(filter)
-        with log_slow_event("remove", cls._meta['collection'], filter):
-            pymongo_collection = cls._pymongo()
-            if multi:
-                result = pymongo_collection.delete_many(
-                    filter, session=session and session.pymongo_session)
-            else:
-                result = pymongo_collection.delete_one(
-                    filter, session=session and session.pymongo_session)
+        try:
+            with log_slow_event("remove", cls._meta['collection'], filter):
+                pymongo_collection = cls._pymongo()
+                if multi:
+                    result = pymongo_collection.delete_many(
+                        filter, session=session and session.pymongo_session)
+                else:
+                    result = pymongo_collection.delete_one(
+                        filter, session=session and session.pymongo_session)
+        finally:
+            cls._invalidate_cached(session=session)
         result_dict = {
             'deleted_count': result.deleted_count,
         }
         result_dict.update(result.raw_result)
         return result_dict
 
-    def save(self, session=None):
+    def save(self, session=None, delta=None):
+        """Write this document to its collection.
+
+        New documents are inserted, or replaced when `force_insert` is off
+        in meta. With `delta` (defaults to `delta_save` in meta) documents
+        loaded from the database only send `$set`/`$unset` updates for
+        their changed fields, and the changed fields are cleared after
+        every save.
+        """
         cls = self.__class__
         force_insert = self._meta['force_insert']
+        if delta is None:
+            delta = self._meta.get('delta_save', False)
         self.validate()
+        if delta and not self._created and self.id is not None:
+            return self._save_delta(session=session)
         doc = self.to_mongo()
         try:
-            collection = self._pymongo()
-            if force_insert or "_id" not in doc:
-                pk_value = collection.insert_one(doc,
-                                                 session=session and session.pymongo_session).inserted_id
-            else:
-                collection.replace_one(
-                    {'_id': doc['_id']}, doc, session=session and session.pymongo_session)
-                pk_value = doc['_id']
+            with log_slow_event("save", self._meta['collection'],
+                                {'_id': doc.get('_id')}):
+                collection = self._pymongo()
+                if force_insert or "_id" not in doc:
+                    pk_value = collection.insert_one(doc,
+                                                     session=session and session.pymongo_session).inserted_id
+                else:
+                    collection.replace_one(
+                        {'_id': doc['_id']}, doc, session=session and session.pymongo_session)
+                    pk_value = doc['_id']
         except pymongo.errors.OperationFailure as err:
             message = 'Could not save document (%s)'
             raise OperationError(message % err)
+        finally:
+            if self.id is not None:
+                self._invalidate_cached(self.id, session=session, keep=self)
         self.id = cls.id.to_python(pk_value)
+        if delta:
+            # the next delta save only sends what changes from now on
+            self._clear_changed_fields()
+        return pk_value
+
+    def _save_delta(self, session=None):
+        cls = self.__class__
+        pk_value = cls.id.to_mongo(self.id)
+        set_data, unset_data = self._delta()
+        update = {}
+        if set_data:
+            update['$set'] = set_data
+        if unset_data:
+            update['$unset'] = unset_data
+        if update:
+            query_filter = {'_id': pk_value}
+            with log_slow_event("save", self._meta['collection'], query_filter):
+                try:
+                    self._pymongo().update_one(
+                        query_filter, update,
+                        session=session and session.pymongo_session)
+                except pymongo.errors.OperationFailure as err:
+                    message = 'Could not save document (%s)'
+                    raise OperationError(message % err)
+                finally:
+                    self._invalidate_cached(self.id, session=session,
+                                            keep=self)
+        self._clear_changed_fields()
         return pk_value
 
     def delete(self, session=None):
@@ -117,32 +175,76 @@ class WriteMixin(BulkMixin, BaseMixin):
             message = u'Could not delete document (%s)' % err.message
             raise OperationError(message)
 
-    def update_one(self, document, session=None):
+    def update_one(self, document, session=None, returning=None):
+        """Apply the update `document` to this document.
+
+        `returning` (defaults to `update_return` in meta) picks what is read
+        back: 'document' fetches the whole updated document and copies every
+        field onto this instance, 'fields' only fetches and copies the top
+        level fields touched by the update, and 'none' sends a plain update
+        and returns the result of `update`, leaving this instance unchanged.
+        """
+        if returning is None:
+            returning = self._meta.get('update_return', 'document')
+        if returning not in ('document', 'fields', 'none'):
+            raise ValueError('Unknown update_return %r' % returning)
         document = self._transform_value(document)
         query_filter = self._update_one_key()
+        if returning == 'none':
+            with log_slow_event("update_one", self._meta['collection'],
+                                query_filter):
+                return self.update(query_filter, document, multi=False,
+                                   session=session)
+        fields = self._fields
+        projection = None
+        if returning == 'fields':
+            fields = self._updated_fields(document)
+            projection = dict((self._db_field_map.get(field, field), True)
+                              for field in fields) or {'_id': True}
         with log_slow_event("update_one", self._meta['collection'], query_filter):
             result = self.find_and_modify(query_filter,
                                           update=document,
-                                          new=True, session=session)
+                                          new=True, projection=projection,
+                                          session=session)
             if result:
-                for field in self._fields:
+                for field in fields:
                     setattr(self, field, result[field])
         return result
 
-    def set(self, _session=None, **kwargs):
-        return self.update_one({'$set': kwargs}, session=_session)
+    @classmethod
+    def _updated_fields(cls, document):
+        """Names of the top level fields modified by an update document."""
+        fields = []
+        for operator_value in document.values():
+            if not isinstance(operator_value, dict):
+                continue
+            for key in operator_value:
+                root = key.split('.', 1)[0]
+                field = cls._reverse_db_field_map.get(root, root)
+                if field in cls._fields and field not in fields:
+                    fields.append(field)
+        return fields
+
+    def set(self, _session=None, _returning=None, **kwargs):
+        return self.update_one({'$set': kwargs}, session=_session,
+                               returning=_returning)
 
-    def unset(self, _session=None, **kwargs):
-        return self.update_one({'$unset': kwargs}, session=_session)
+    def unset(self, _session=None, _returning=None, **kwargs):
+        return self.update_one({'$unset': kwargs}, session=_session,
+                               returning=_returning)
 
-    def inc(self, _session=None, **kwargs):
-        return self.update_one({'$inc': kwargs}, session=_session)
+    def inc(self, _session=None, _returning=None, **kwargs):
+        return self.update_one({'$inc': kwargs}, session=_session,
+                               returning=_returning)
 
-    def push(self, _session=None, **kwargs):
-        return self.update_one({'$push': kwargs}, session=_session)
+    def push(self, _session=None, _returning=None, **kwargs):
+        return self.update_one({'$push': kwargs}, session=_session,
+                               returning=_returning)
 
-    def pull(self, _session=None, **kwargs):
-        return self.update_one({'$pull': kwargs}, session=_session)
+    def pull(self, _session=None, _returning=None, **kwargs):
+        return self.update_one({'$pull': kwargs}, session=_session,
+                               returning=_returning)
 
-    def add_to_set(self, _session=None, **kwargs):
-        return self.update_one({'$addToSet': kwargs}, session=_session)
+    def add_to_set(self, _session=None, _returning=None, **kwargs):
+        return self.update_one({'$addToSet': kwargs}, session=_session,
+                               returning=_returning)
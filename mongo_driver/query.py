@@ -0,0 +1,81 @@
+import inspect
+import time
+from concurrent.futures import wait
+from mongo_driver import executor
+from mongo_driver.errors import GatherTimeoutError
+
+__all__ = ('Query', 'gather')
+
+
+class Query(object):
+    """A read of a document class run later, see `ReadMixin.q` and
+    `gather`.
+    """
+
+    def __init__(self, document_class, method, args, kwargs):
+        self.document_class = document_class
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+
+    def _with(self, method, kwargs):
+        # only the arguments of the find that `method` accepts
+        parameters = inspect.signature(
+            getattr(self.document_class, method)).parameters
+        new_kwargs = dict((key, value) for key, value in self.kwargs.items()
+                          if key in parameters or key == 'retry_policy')
+        new_kwargs.update(kwargs)
+        return Query(self.document_class, method, self.args, new_kwargs)
+
+    def one(self, **kwargs):
+        """The same query as a `find_one`."""
+        return self._with('find_one', kwargs)
+
+    def count(self, **kwargs):
+        """The same query as a `count`."""
+        return self._with('count', kwargs)
+
+    def run(self, max_time_ms=None):
+        """Run the query, limited to `max_time_ms` on the server unless it
+        has a lower max_time_ms of its own.
+        """
+        kwargs = self.kwargs
+        if max_time_ms is not None and not (
+                0 < (kwargs.get('max_time_ms') or 0) <= max_time_ms):
+            kwargs = dict(kwargs, max_time_ms=max_time_ms)
+        return getattr(self.document_class, self.method)(*self.args, **kwargs)
+
+    def __repr__(self):
+        return '<Query %s.%s%r>' % (
+            self.document_class.__name__, self.method, self.args)
+
+
+def gather(queries, timeout=None):
+    """Run independent `queries` concurrently in the shared executor and
+    return their results in the same order.
+
+    With `timeout` (seconds), GatherTimeoutError is raised if not every
+    query has completed by then. Queries are limited on the server to the
+    time left when they start, those still waiting for a thread are
+    cancelled. The first failed query, in order, raises its exception.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    futures = [executor.submit(_run_query, query, deadline)
+               for query in queries]
+    done, not_done = wait(futures, timeout=timeout)
+    if not_done:
+        for future in not_done:
+            future.cancel()
+        raise GatherTimeoutError(
+            '%d of %d queries not completed after %ss' % (
+                len(not_done), len(futures), timeout))
+    return [future.result() for future in futures]
+
+
+def _run_query(query, deadline):
+    if deadline is None:
+        return query.run()
+    max_time_ms = int((deadline - time.monotonic()) * 1000)
+    if max_time_ms < 1:
+        raise GatherTimeoutError('%r not started before the timeout' % query)
+    return query.run(max_time_ms=max_time_ms)
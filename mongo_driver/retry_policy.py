@@ -0,0 +1,103 @@
+import contextvars
+import functools
+import logging
+import random
+import time
+import pymongo
+from mongo_driver.connection import ConnectionError
+
+__all__ = ('RetryPolicy', 'DEFAULT_RETRY_POLICY', 'NO_RETRY')
+
+RETRY_ERRORS = (
+    pymongo.errors.ConnectionFailure,
+    ConnectionError
+)
+RETRY_LOGGER = logging.getLogger('mongo_driver.pymongo_retry')
+
+# set while a call is being retried, nested retryable calls run once
+_retrying = contextvars.ContextVar('mongo_driver_retrying', default=False)
+
+
+class RetryPolicy(object):
+    """How reads are retried on connection errors.
+
+    The n-th retry waits a random time up to `base_delay * 2 ** n` seconds,
+    capped to `max_delay`. A call is tried at most `tries` times and is not
+    retried once a wait would end more than `deadline` seconds after the
+    first try started.
+    """
+
+    def __init__(self, tries=5, base_delay=0.5, max_delay=5, deadline=15,
+                 exceptions=RETRY_ERRORS, logger=RETRY_LOGGER):
+        self.tries = tries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.exceptions = exceptions
+        self.logger = logger
+
+    def _sleep(self, delay):
+        time.sleep(delay)
+
+    def delay(self, attempt):
+        """Random wait before retry number `attempt`, from 0."""
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, func, *args, **kwargs):
+        start_time = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except self.exceptions as e:
+                if attempt + 1 >= self.tries:
+                    raise
+                delay = self.delay(attempt)
+                if (self.deadline is not None and
+                        time.monotonic() - start_time + delay > self.deadline):
+                    raise
+                if self.logger is not None:
+                    self.logger.warning(
+                        '%s, retrying in %.3f seconds...', e, delay)
+                self._sleep(delay)
+                attempt += 1
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+NO_RETRY = RetryPolicy(tries=1)
+
+
+def get_retry_policy(owner):
+    """Retry policy from the `retry` meta of a document class or instance,
+    either a RetryPolicy or the keyword arguments of one.
+    """
+    policy = getattr(owner, '_meta', {}).get('retry')
+    if policy is None:
+        return DEFAULT_RETRY_POLICY
+    if isinstance(policy, dict):
+        return RetryPolicy(**policy)
+    return policy
+
+
+def retryable(func):
+    """Retry a method of a document class on connection errors.
+
+    The policy comes from the `retry_policy` keyword argument or the class
+    meta. Only the outermost retryable call is retried, calls made from it
+    run once.
+    """
+    @functools.wraps(func)
+    def wrapper(owner, *args, **kwargs):
+        policy = kwargs.pop('retry_policy', None)
+        if _retrying.get():
+            return func(owner, *args, **kwargs)
+        if policy is None:
+            policy = get_retry_policy(owner)
+        token = _retrying.set(True)
+        try:
+            return policy.call(func, owner, *args, **kwargs)
+        finally:
+            _retrying.reset(token)
+    return wrapper
@@ -35,6 +35,8 @@ class TransactionContext(object):
 class Session(object):
     def __init__(self, pymongo_client_session):
         self._pymongo_client_session = pymongo_client_session
+        # set by mongo_driver.identity_map(session=...)
+        self.identity_map = None
 
     @property
     def pymongo_session(self):
@@ -1,17 +1,125 @@
+import functools
+import math
+import threading
 import time
 from contextlib import contextmanager
+from bson import BSON
 
 callback = None
 
 SLOW_THRESHOLD = 100
 
-@contextmanager
-def log_slow_event(event_name, collection, params, threshold=None):
-    start_time = time.time()
+# histogram buckets grow by 2 ** (1 / BUCKETS_PER_OCTAVE), ~19% apart
+BUCKETS_PER_OCTAVE = 4
+
+# sum the BSON size of the documents read through timed cursors, this
+# encodes every document again
+MEASURE_BYTES = False
+
+
+class LatencyHistogram(object):
+    """Counts of latencies in logarithmic buckets of nanoseconds."""
+
+    __slots__ = ('count', 'total_ns', 'min_ns', 'max_ns', 'buckets',
+                 'documents', 'bytes')
+
+    def __init__(self):
+        self.count = 0
+        self.documents = 0
+        self.bytes = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = None
+        self.buckets = {}
+
+    def record(self, run_time_ns):
+        bucket = int(math.log2(run_time_ns) * BUCKETS_PER_OCTAVE) \
+            if run_time_ns > 1 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total_ns += run_time_ns
+        if self.min_ns is None or run_time_ns < self.min_ns:
+            self.min_ns = run_time_ns
+        if self.max_ns is None or run_time_ns > self.max_ns:
+            self.max_ns = run_time_ns
+
+    def percentile(self, percent):
+        """Estimate of the `percent` percentile in nanoseconds, the middle
+        of the bucket it falls in.
+        """
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(self.count * percent / 100.0)))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                break
+        value = 2 ** ((bucket + 0.5) / BUCKETS_PER_OCTAVE)
+        return min(max(value, self.min_ns), self.max_ns)
+
+    def snapshot(self):
+        """Summary of the histogram, times in milliseconds."""
+        def to_ms(value):
+            return None if value is None else value / 1e6
+        return {
+            'count': self.count,
+            'documents': self.documents,
+            'bytes': self.bytes,
+            'total_ms': to_ms(self.total_ns),
+            'mean_ms': to_ms(self.count and self.total_ns / self.count),
+            'min_ms': to_ms(self.min_ns),
+            'max_ms': to_ms(self.max_ns),
+            'p50_ms': to_ms(self.percentile(50)),
+            'p95_ms': to_ms(self.percentile(95)),
+            'p99_ms': to_ms(self.percentile(99)),
+        }
 
-    yield
 
-    run_time = 1000.0 * (time.time() - start_time)
+class MetricsRegistry(object):
+    """Latency histograms of the operations per collection and event."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def record(self, event_name, collection, run_time_ns, documents=0,
+               bytes=0):
+        key = (collection, event_name)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.record(run_time_ns)
+            histogram.documents += documents
+            histogram.bytes += bytes
+
+    def snapshot(self):
+        """Return {collection: {event_name: summary}} for every recorded
+        operation, see `LatencyHistogram.snapshot`.
+        """
+        with self._lock:
+            items = [(key, histogram.snapshot())
+                     for key, histogram in self._histograms.items()]
+        result = {}
+        for (collection, event_name), summary in items:
+            result.setdefault(collection, {})[event_name] = summary
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+
+metrics = MetricsRegistry()
+
+
+def record_event(event_name, collection, params, run_time_ns, threshold=None,
+                 documents=0, bytes=0):
+    metrics.record(event_name, collection, run_time_ns,
+                   documents=documents, bytes=bytes)
+
+    run_time = run_time_ns / 1e6
 
     if threshold is None:
         threshold = SLOW_THRESHOLD
@@ -19,6 +127,91 @@ def log_slow_event(event_name, collection, params, threshold=None):
     if run_time > threshold and callback:
         callback(event_name, collection, params, run_time)
 
+
+@contextmanager
+def log_slow_event(event_name, collection, params, threshold=None):
+    start_time = time.perf_counter_ns()
+
+    yield
+
+    record_event(event_name, collection, params,
+                 time.perf_counter_ns() - start_time, threshold=threshold)
+
+
+def document_bytes(doc):
+    """BSON size of a document read, counted with MEASURE_BYTES only."""
+    if not MEASURE_BYTES or doc is None:
+        return 0
+    return len(BSON.encode(doc))
+
+
+class TimedCursor(object):
+    """Iterate a pymongo cursor and record the event once it is exhausted,
+    fails or is closed, so the time spent fetching batches and the number
+    of documents returned are included. Other attributes are looked up on
+    the wrapped cursor, chained cursor methods (`sort`, `limit`, ...)
+    return the timed cursor.
+    """
+
+    def __init__(self, cursor, event_name, collection, params,
+                 start_time=None, threshold=None):
+        self.cursor = cursor
+        self._event = (event_name, collection, params)
+        self._start_time = start_time or time.perf_counter_ns()
+        self._threshold = threshold
+        self._documents = 0
+        self._bytes = 0
+        self._finished = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            doc = next(self.cursor)
+        except BaseException:
+            self._finish()
+            raise
+        self._documents += 1
+        self._bytes += document_bytes(doc)
+        return doc
+
+    next = __next__
+
+    def __getattr__(self, name):
+        attr = getattr(self.cursor, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def method(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return self if result is self.cursor else result
+        return method
+
+    def _finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        event_name, collection, params = self._event
+        record_event(event_name, collection, params,
+                     time.perf_counter_ns() - self._start_time,
+                     threshold=self._threshold, documents=self._documents,
+                     bytes=self._bytes)
+
+    def close(self):
+        self.cursor.close()
+        self._finish()
+
+
 def set_slow_event_callback(new_callback):
     global callback
     callback = new_callback
+
+
+def get_metrics():
+    return metrics.snapshot()
+
+
+def reset_metrics():
+    metrics.reset()
@@ -4,4 +4,8 @@ from tests.write_test import *
 from tests.index_test import *
 from tests.connection_test import *
 from tests.field_test import *
-from tests.transaction_test import *
\ No newline at end of file
+from tests.transaction_test import *
+from tests.document_test import *
+from tests.timer_test import *
+from tests.retry_test import *
+from tests.async_test import *
\ No newline at end of file
@@ -0,0 +1,58 @@
+import asyncio
+import unittest
+from tests.model.testdoc import TestDoc
+from mongo_driver.connection import connect, clear_all
+from mongo_driver.errors import ConnectionError
+from mongo_driver import identity_map
+
+
+class AsyncTests(unittest.TestCase):
+    def setUp(self):
+        try:
+            connect(db_names=['test'])
+        except ConnectionError:
+            self.skipTest('Mongo service is not started localhost')
+
+    def tearDown(self):
+        clear_all()
+
+    def _run(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def test_async_read_write(self):
+        async def run():
+            await TestDoc.aremove({})
+            await asyncio.gather(*[TestDoc(test_pk=i, test_int=i).asave()
+                                   for i in range(20)])
+            self.assertEqual(await TestDoc.acount({}), 20)
+            docs = await TestDoc.afind({'test_pk': {'$lt': 5}})
+            self.assertEqual(len(docs), 5)
+            doc = await TestDoc.afind_one({'test_pk': 3})
+            self.assertEqual(doc.test_int, 3)
+            await doc.aupdate_one({'$inc': {'test_int': 1}})
+            self.assertEqual(doc.test_int, 4)
+            result = await TestDoc.aupdate({'test_pk': {'$gte': 10}},
+                                           {'$set': {'test_int': -1}})
+            self.assertEqual(result['modified_count'], 10)
+            pks = [doc.test_pk async for doc in TestDoc.afind_iter(
+                {'test_int': -1}, sort=[('test_pk', 1)], batch_size=3)]
+            self.assertEqual(pks, list(range(10, 20)))
+            with identity_map():
+                doc = await TestDoc.aby_id(doc.id)
+                self.assertIs(await TestDoc.aby_id(doc.id), doc)
+        self._run(run())
+
+    def test_async_bulk(self):
+        async def run():
+            await TestDoc.aremove({})
+            async with TestDoc.abulk(max_ops=10) as bulk_context:
+                for i in range(25):
+                    TestDoc(test_pk=i).bulk_save(bulk_context)
+            self.assertEqual(bulk_context.bulk_api_result['nInserted'], 25)
+            self.assertEqual(await TestDoc.acount({}), 25)
+            with self.assertRaises(ValueError):
+                async with TestDoc.abulk() as bulk_context:
+                    TestDoc(test_pk=100).bulk_save(bulk_context)
+                    raise ValueError()
+            self.assertEqual(await TestDoc.acount({}), 25)
+        self._run(run())
@@ -1,6 +1,7 @@
 import unittest
 from tests.model.testdoc import TestDoc
 from mongo_driver.connection import connect, clear_all
+from mongo_driver.errors import BulkOperationError
 
 
 class BulkTests(unittest.TestCase):
@@ -120,3 +121,119 @@ class BulkTests(unittest.TestCase):
         self.assertEqual(count4, 10)
         self.assertEqual(count5, 10)
         self.assertEqual(count6, 50)
+
+    def test_bulk_auto_flush(self):
+        limit = 105
+        self._clear()
+        with TestDoc.bulk(max_ops=10) as bulk_context:
+            for i in range(limit):
+                TestDoc(test_pk=i).bulk_save(bulk_context)
+                self.assertEqual(bulk_context.bulk_api_result['nInserted'],
+                                 (i + 1) // 10 * 10)
+        self.assertEqual(TestDoc.count({}), limit)
+        self.assertEqual(bulk_context.bulk_api_result['nInserted'], limit)
+        with TestDoc.bulk(max_bytes=1024) as bulk_context:
+            for i in range(limit):
+                TestDoc.bulk_update(bulk_context, {'test_pk': i}, {
+                    '$set': {'test_int': i}}, multi=False)
+            self.assertLess(len(bulk_context._requests), limit)
+        self.assertEqual(bulk_context.bulk_api_result['nModified'], limit)
+        self.assertEqual(TestDoc.count({'test_int': {'$gte': 0}}), limit)
+        # pipeline updates are sized stage by stage
+        with TestDoc.bulk(max_bytes=1024) as bulk_context:
+            for i in range(limit):
+                TestDoc.bulk_update(bulk_context, {'test_pk': i}, [
+                    {'$set': {'test_int': -i}}], multi=False)
+            self.assertLess(len(bulk_context._requests), limit)
+        self.assertEqual(TestDoc.count({'test_int': {'$lte': 0}}), limit)
+
+    def test_bulk_auto_flush_errors(self):
+        self._clear()
+        docs = [TestDoc(test_pk=i) for i in range(10)]
+        for doc in docs:
+            doc.save()
+        # inserting existing documents fails in the 1st and the 3rd chunks
+        with self.assertRaises(BulkOperationError) as context:
+            with TestDoc.bulk(unordered=True, max_ops=4) as bulk_context:
+                for i in range(12):
+                    doc = docs[i] if i in (1, 9) else TestDoc(test_pk=i)
+                    doc.bulk_save(bulk_context)
+        error = context.exception
+        self.assertEqual([offset for offset, _ in error.chunk_errors], [0, 8])
+        self.assertEqual([e['index'] for e in error.write_errors], [1, 9])
+        self.assertEqual(bulk_context.bulk_api_result['nInserted'], 10)
+        self.assertEqual(TestDoc.count({}), 20)
+        # ordered bulks stop at the first failed chunk
+        with self.assertRaises(BulkOperationError):
+            with TestDoc.bulk(max_ops=4) as bulk_context:
+                for i in range(12):
+                    doc = docs[i] if i == 1 else TestDoc(test_pk=i)
+                    doc.bulk_save(bulk_context)
+        self.assertEqual(bulk_context.bulk_api_result['nInserted'], 1)
+        self.assertEqual(TestDoc.count({}), 21)
+
+    def test_bulk_background(self):
+        limit = 105
+        self._clear()
+        with TestDoc.bulk(max_ops=10, background=True) as bulk_context:
+            for i in range(limit):
+                TestDoc(test_pk=i).bulk_save(bulk_context)
+        self.assertEqual(TestDoc.count({}), limit)
+        self.assertEqual(bulk_context.bulk_api_result['nInserted'], limit)
+        # chunks already handed to the writer are written on exceptions
+        try:
+            with TestDoc.bulk(max_ops=10, background=True) as bulk_context:
+                for i in range(25):
+                    TestDoc(test_pk=i).bulk_save(bulk_context)
+                raise Exception()
+        except Exception:
+            pass
+        self.assertEqual(TestDoc.count({}), limit + 20)
+
+    def test_bulk_background_errors(self):
+        self._clear()
+        docs = [TestDoc(test_pk=i) for i in range(10)]
+        for doc in docs:
+            doc.save()
+        with self.assertRaises(BulkOperationError) as context:
+            with TestDoc.bulk(unordered=True, max_ops=4,
+                              background=True) as bulk_context:
+                for i in range(12):
+                    doc = docs[i] if i in (1, 9) else TestDoc(test_pk=i)
+                    doc.bulk_save(bulk_context)
+        error = context.exception
+        self.assertEqual([offset for offset, _ in error.chunk_errors], [0, 8])
+        self.assertEqual(bulk_context.bulk_api_result['nInserted'], 10)
+        with self.assertRaises(BulkOperationError):
+            with TestDoc.bulk(max_ops=4, background=True) as bulk_context:
+                for i in range(12):
+                    doc = docs[i] if i == 1 else TestDoc(test_pk=i)
+                    doc.bulk_save(bulk_context)
+        self.assertEqual(bulk_context.bulk_api_result['nInserted'], 1)
+        self.assertEqual(TestDoc.count({}), 21)
+
+    def test_bulk_parallel(self):
+        limit = 105
+        self._clear()
+        with TestDoc.bulk_parallel(workers=3, max_ops=10) as bulk_context:
+            for i in range(limit):
+                TestDoc(test_pk=i).bulk_save(bulk_context)
+        self.assertEqual(TestDoc.count({}), limit)
+        self.assertEqual(bulk_context.bulk_api_result['nInserted'], limit)
+        docs = TestDoc.find({'test_pk': {'$in': [3, 57]}})
+        with self.assertRaises(BulkOperationError) as context:
+            with TestDoc.bulk_parallel(workers=3, max_ops=10) as bulk_context:
+                for doc in docs:
+                    doc.bulk_save(bulk_context)
+                for i in range(limit, 2 * limit):
+                    TestDoc(test_pk=i).bulk_save(bulk_context)
+        self.assertEqual([e['index'] for e in context.exception.write_errors],
+                         [0, 1])
+        self.assertEqual(bulk_context.bulk_api_result['nInserted'], limit)
+        self.assertEqual(TestDoc.count({}), 2 * limit)
+        with self.assertRaises(ValueError):
+            with TestDoc.bulk_parallel(unordered=False):
+                pass
+        with self.assertRaises(ValueError):
+            with TestDoc.bulk(unordered=True, workers=3):
+                pass
@@ -2,10 +2,11 @@ import unittest
 import pymongo
 import mongomock
 from mongo_driver.connection import connect, get_db, get_connection, clear_all, \
-    get_admin_db, DEFAULT_WRITE_CONCERN, DEFAULT_WTIMEOUT, DEFAULT_READ_CONCERN_LEVEL
-from mongo_driver import Document
+    get_admin_db, DEFAULT_WRITE_CONCERN, DEFAULT_WTIMEOUT, DEFAULT_READ_CONCERN_LEVEL, \
+    _registry, route_reads
+from mongo_driver import Document, SlaveOkSetting
 from mongo_driver.fields import IntField
-from mongo_driver.errors import OperationError
+from mongo_driver.errors import OperationError, ConnectionError
 
 
 class ConnectionTests(unittest.TestCase):
@@ -176,3 +177,144 @@ class ConnectionTests(unittest.TestCase):
                          DEFAULT_READ_CONCERN_LEVEL)
         self.assertEqual(conn.pymongo_client.read_concern.level,
                          DEFAULT_READ_CONCERN_LEVEL)
+
+    def test_collection_cache(self):
+        class Doc(Document):
+            meta = {
+                'db_name': 'test'
+            }
+
+        conn1 = connect(db_names=['test'])
+        coll = Doc._pymongo()
+        self.assertIs(Doc._pymongo(), coll)
+        offline_coll = Doc._pymongo(slave_ok_setting=SlaveOkSetting.OFFLINE)
+        self.assertIsNot(offline_coll, coll)
+        self.assertIs(
+            Doc._pymongo(slave_ok_setting=SlaveOkSetting.OFFLINE), offline_coll)
+        self.assertEqual(offline_coll.read_preference,
+                         SlaveOkSetting.TO_PYMONGO[SlaveOkSetting.OFFLINE])
+        Doc._meta['write_concern'] = 1
+        try:
+            self.assertEqual(Doc._pymongo().write_concern.document['w'], 1)
+        finally:
+            del Doc._meta['write_concern']
+        clear_all()
+        conn2 = connect(db_names=['test'])
+        new_coll = Doc._pymongo()
+        self.assertIsNot(new_coll, coll)
+        self.assertIs(new_coll.database.client, conn2.pymongo_client)
+        connect(conn_name='conn2', db_names=['test2'])
+        self.assertIsNot(Doc._pymongo(), new_coll)
+
+    def test_lazy_client(self):
+        conn = connect(db_names=['test'], is_mock=True)
+        self.assertIsNone(conn._mongo_client)
+        self.assertIsNone(get_db('unknown'))
+        connect(conn_name='conn2', db_names=['unknown'], is_mock=True)
+        self.assertEqual(get_db('unknown').name, 'unknown')
+        client = conn.pymongo_client
+        self.assertIs(conn.pymongo_client, client)
+        self.assertIs(get_db('test').client, client)
+
+    def test_pid_change(self):
+        class Doc(Document):
+            meta = {
+                'db_name': 'test'
+            }
+
+        conn = connect(db_names=['test'], is_mock=True)
+        client = conn.pymongo_client
+        coll = Doc._pymongo()
+        # as seen from a forked child
+        _registry._pid = -1
+        conn._pid = -1
+        new_coll = Doc._pymongo()
+        self.assertIsNot(new_coll, coll)
+        self.assertIsNot(conn.pymongo_client, client)
+        self.assertIs(new_coll.database.client, conn.pymongo_client)
+        self.assertIs(Doc._pymongo(), new_coll)
+
+    def test_pid_change_executor(self):
+        from mongo_driver import executor
+        pool = executor.get_executor()
+        self.assertIs(executor.get_executor(), pool)
+        # as seen from a forked child, where the worker threads are gone
+        executor._executor_pid = -1
+        new_pool = executor.get_executor()
+        self.assertIsNot(new_pool, pool)
+        self.assertEqual(executor.submit(lambda: 1).result(timeout=3), 1)
+
+    def test_fork_rebuilds_client(self):
+        conn = connect(host='db.example.com', db_names=['test'],
+                       max_pool_size=10, is_mock=True)
+        self.assertEqual(conn.connect_kwargs['host'], 'db.example.com')
+        self.assertEqual(conn.connect_kwargs['max_pool_size'], 10)
+        client = conn.pymongo_client
+        self.assertIs(conn.pymongo_client, client)
+        # as seen from a forked child
+        conn._pid = -1
+        new_client = conn.pymongo_client
+        self.assertIsNot(new_client, client)
+        self.assertIs(conn.pymongo_client, new_client)
+        self.assertEqual(new_client.address, client.address)
+
+    def test_read_route(self):
+        class Doc(Document):
+            meta = {
+                'db_name': 'test'
+            }
+            test_int = IntField()
+
+        class RoutedDoc(Document):
+            meta = {
+                'db_name': 'test',
+                'collection': 'doc',
+                'read_route': {'read_preference': 'nearest',
+                               'max_staleness': 90},
+            }
+            test_int = IntField()
+
+        main = connect(db_names=['test'], is_mock=True)
+        analytics = connect(conn_name='analytics', is_mock=True)
+        Doc(test_int=1).save()
+        analytics.pymongo_client['test']['doc'].insert_one({'test_int': 2})
+        self.assertEqual(Doc.find_one({}).test_int, 1)
+
+        route_reads('test', conn_name='analytics',
+                    read_preference='secondaryPreferred',
+                    tag_sets=[{'dc': 'east'}])
+        coll = Doc._pymongo(slave_ok_setting=SlaveOkSetting.PRIMARY)
+        self.assertIs(coll.database.client, analytics.pymongo_client)
+        self.assertEqual(coll.read_preference.mode, 3)
+        self.assertEqual(coll.read_preference.tag_sets, [{'dc': 'east'}])
+        self.assertEqual(Doc.find_one({}).test_int, 2)
+        # indexes are those of the connection of the db
+        main.pymongo_client['test']['doc'].create_index('test_int')
+        self.assertIn('test_int_1', [
+            index.real_name for index in Doc.list_indexes(display=False)
+            if index.built])
+        # writes and reads in a session stay on the connection of the db
+        self.assertIs(Doc._pymongo().database.client, main.pymongo_client)
+        self.assertIs(
+            Doc._pymongo(slave_ok_setting=SlaveOkSetting.PRIMARY,
+                         session=object()).database.client,
+            main.pymongo_client)
+        # the route of the class takes precedence
+        routed = RoutedDoc._pymongo(slave_ok_setting=SlaveOkSetting.OFFLINE)
+        self.assertIs(routed.database.client, main.pymongo_client)
+        self.assertEqual(routed.read_preference.mongos_mode, 'nearest')
+        self.assertEqual(routed.read_preference.max_staleness, 90)
+        self.assertIs(
+            RoutedDoc._pymongo(slave_ok_setting=SlaveOkSetting.OFFLINE),
+            routed)
+
+        route_reads('test')
+        self.assertIs(
+            Doc._pymongo(slave_ok_setting=SlaveOkSetting.PRIMARY),
+            Doc._pymongo(slave_ok_setting=SlaveOkSetting.PRIMARY))
+        self.assertEqual(Doc.find_one({}).test_int, 1)
+        route_reads('test', conn_name='missing')
+        with self.assertRaises(ConnectionError):
+            Doc.find_one({})
+        with self.assertRaises(ValueError):
+            route_reads('test', read_preference='anywhere')
@@ -0,0 +1,189 @@
+import unittest
+import datetime
+from bson import ObjectId
+from mongo_driver import Document, EmbeddedDocument
+from mongo_driver.fields import *
+from mongo_driver.errors import InvalidDocumentError
+from tests.model.testdoc import TestDoc, TestEDoc
+
+
+class ChoiceDoc(Document):
+    meta = {
+        'db_name': 'test',
+        'allow_inheritance': True,
+    }
+    test_choice = IntField(choices=[(1, 'one'), (2, 'two')])
+    test_str = StringField(default='default')
+
+
+class SubChoiceDoc(ChoiceDoc):
+    test_float = FloatField()
+
+
+class LazyEDoc(EmbeddedDocument):
+    meta = {
+        'lazy': True,
+    }
+    test_int = IntField()
+    test_date = DateTimeField()
+
+
+class LazyDoc(Document):
+    meta = {
+        'db_name': 'test',
+        'lazy': True,
+    }
+    test_int = IntField(default=1)
+    test_str = StringField()
+    test_edoc = EmbeddedDocumentField('LazyEDoc')
+    test_edocs = EmbeddedDocumentListField('LazyEDoc')
+
+
+class InitDoc(Document):
+    meta = {
+        'db_name': 'test',
+    }
+    test_int = IntField(default=1)
+    test_str = StringField()
+
+    def __init__(self, *args, **kwargs):
+        super(InitDoc, self).__init__(*args, **kwargs)
+        self.loaded_by_init = True
+
+
+class DocumentTests(unittest.TestCase):
+    def test_from_son(self):
+        doc_id = ObjectId()
+        doc = TestDoc._from_son({
+            '_id': doc_id,
+            'test_pk': 1,
+            'test_int': None,
+            'test_edoc': {'test_int': '2'},
+            'test_list_edoct': [{
+                'test_int': 3,
+                'test_timelist': [{'test_date': datetime.datetime(2019, 1, 1)}]
+            }],
+            'test_extra': 'extra',
+        })
+        self.assertEqual(doc.id, doc_id)
+        self.assertEqual(doc.test_pk, 1)
+        self.assertEqual(doc.test_int, None)
+        self.assertEqual(doc.test_str, None)
+        self.assertEqual(doc.test_list, [])
+        self.assertEqual(doc.test_dict, {})
+        self.assertEqual(doc._data['test_extra'], 'extra')
+        self.assertEqual(doc._cls, 'TestDoc')
+        self.assertFalse(doc._created)
+        self.assertEqual(doc._changed_fields, [])
+        self.assertIsInstance(doc.test_edoc, TestEDoc)
+        self.assertEqual(doc.test_edoc.test_int, 2)
+        edoc = doc.test_list_edoct[0]
+        self.assertEqual(edoc.test_int, 3)
+        self.assertEqual(
+            edoc.test_timelist[0].test_date, datetime.datetime(2019, 1, 1))
+        # embedded documents report their changes to the parent
+        edoc.test_int = 4
+        doc.test_int = 5
+        self.assertEqual(doc._get_changed_fields(),
+                         ['test_int', 'test_list_edoct.0.test_int'])
+
+    def test_from_son_options(self):
+        doc = TestDoc._from_son({'test_pk': 1}, only_fields=['test_pk', 'test_list'],
+                                created=True)
+        self.assertTrue(doc._created)
+        self.assertNotIn('test_list', doc._data)
+        self.assertEqual(doc._data['test_dict'], {})
+        self.assertRaises(InvalidDocumentError,
+                          TestDoc._from_son, {'test_edoc': 1})
+
+    def test_from_son_inheritance(self):
+        doc = ChoiceDoc._from_son({
+            '_cls': 'ChoiceDoc.SubChoiceDoc',
+            'test_choice': 1,
+            'test_str': None,
+            'test_float': 2,
+        })
+        self.assertIsInstance(doc, SubChoiceDoc)
+        self.assertEqual(doc._cls, 'ChoiceDoc.SubChoiceDoc')
+        self.assertEqual(doc.test_str, 'default')
+        self.assertEqual(doc.test_float, 2.0)
+        self.assertEqual(doc.get_test_choice_display(), 'one')
+        doc = ChoiceDoc._from_son({'test_choice': 2})
+        self.assertIsInstance(doc, ChoiceDoc)
+        self.assertEqual(doc._cls, 'ChoiceDoc')
+        self.assertEqual(doc.get_test_choice_display(), 'two')
+
+    def test_lazy_from_son(self):
+        son = {
+            '_id': ObjectId(),
+            'test_int': '2',
+            'test_str': 'str',
+            'test_edoc': {'test_int': 3},
+            'test_edocs': [{'test_int': i} for i in range(3)],
+        }
+        doc = LazyDoc._from_son(son)
+        self.assertEqual(set(doc._lazy_data),
+                         {'id', 'test_int', 'test_edoc', 'test_edocs'})
+        self.assertEqual(doc._data['test_str'], 'str')
+        self.assertEqual(doc.test_int, 2)
+        self.assertNotIn('test_int', doc._lazy_data)
+        edocs = doc.test_edocs
+        self.assertEqual([edoc.test_int for edoc in edocs], [0, 1, 2])
+        edocs[1].test_int = 10
+        self.assertEqual(doc._get_changed_fields(), ['test_edocs.1.test_int'])
+        # assigning a field drops its undecoded value
+        doc.test_edoc = LazyEDoc(test_int=4)
+        self.assertEqual(doc._lazy_data, {'id': son['_id']})
+        self.assertEqual(doc.test_edoc.test_int, 4)
+        data = doc.to_mongo()
+        self.assertFalse(doc._lazy_data)
+        self.assertEqual(data['_id'], son['_id'])
+        self.assertEqual(data['test_edocs'][1]['test_int'], 10)
+        doc.validate()
+        # assigning the loaded value of a lazy field changes nothing
+        doc = LazyDoc._from_son(son)
+        doc.test_int = 2
+        doc.test_edoc = LazyEDoc(test_int=3)
+        self.assertEqual(doc._get_changed_fields(), [])
+        doc.test_int = 3
+        self.assertEqual(doc._get_changed_fields(), ['test_int'])
+
+    def test_from_son_custom_init(self):
+        doc_id = ObjectId()
+        doc = InitDoc._from_son({'_id': doc_id, 'test_str': 'str'})
+        self.assertTrue(doc.loaded_by_init)
+        self.assertEqual(doc.id, doc_id)
+        self.assertEqual(doc.test_str, 'str')
+        self.assertEqual(doc.test_int, 1)
+        self.assertFalse(doc._created)
+        self.assertEqual(doc._get_changed_fields(), [])
+
+    def test_lazy_from_son_errors(self):
+        doc = LazyDoc._from_son({'test_edoc': 1})
+        self.assertEqual(doc.test_int, 1)
+        with self.assertRaises(InvalidDocumentError):
+            doc.test_edoc
+        self.assertEqual(LazyEDoc._from_son({'test_int': '1'}),
+                         LazyEDoc(test_int=1))
+
+    def test_to_mongo(self):
+        edoc = TestEDoc(test_int=1, test_timelist=[])
+        doc = TestDoc(test_pk=1, test_edoc=edoc, test_list=[2, 1],
+                      test_list_edoct=[edoc, edoc])
+        self.assertEqual([plan[0] for plan in TestDoc._mongo_plan],
+                         list(TestDoc._fields_ordered))
+        self.assertTrue(TestDoc.test_list._to_mongo_accepts_fields)
+        self.assertFalse(TestDoc.test_int._to_mongo_accepts_fields)
+        data = doc.to_mongo()
+        self.assertEqual(list(data.keys()),
+                         ['test_pk', 'test_list', 'test_edoc', 'test_dict',
+                          'test_list_edoct'])
+        self.assertEqual(data['test_list'], [2, 1])
+        self.assertEqual(data['test_list_edoct'],
+                         [{'test_int': 1, 'test_timelist': []}] * 2)
+        data = doc.to_mongo(fields=['test_edoc.test_int', 'test_pk'])
+        self.assertEqual(list(data.keys()), ['test_pk', 'test_edoc'])
+        self.assertEqual(data['test_edoc'], {'test_int': 1})
+        doc = ChoiceDoc(test_choice=1)
+        self.assertEqual(list(doc.to_mongo().keys()),
+                         ['_cls', 'test_choice', 'test_str'])
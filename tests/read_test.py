@@ -3,12 +3,29 @@ import pymongo
 import threading
 import random
 import time
+from bson import ObjectId
 from pymongo.write_concern import WriteConcern
 from pymongo.errors import ConnectionFailure
 from tests.model.testdoc import TestDoc
+from mongo_driver import Document, IntField, StringField
 from mongo_driver.connection import connect, clear_all
 from mongo_driver import SlaveOkSetting
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class CachedDoc(Document):
+    meta = {
+        'db_name': 'test',
+        'indexes': [{'keys': 'name:1', 'unique': True}],
+        'cache': {'ttl': 60, 'max_entries': 3},
+    }
+    name = StringField()
+    value = IntField()
+
 
 class ReadTests(unittest.TestCase):
     def setUp(self):
@@ -145,3 +162,340 @@ class ReadTests(unittest.TestCase):
         self.assertEqual(len(new_docs), 10)
         new_docs = TestDoc.by_ids(doc_ids_str)
         self.assertEqual(len(new_docs), 10)
+
+    def test_find_raw(self):
+        self._clear()
+        self._feed_data(10)
+        docs = TestDoc.find({'test_pk': {'$lt': 5}}, raw=True,
+                            projection={'test_pk': True, 'test_str': True})
+        self.assertEqual(len(docs), 5)
+        for doc in docs:
+            self.assertIsInstance(doc, dict)
+            self.assertEqual(set(doc.keys()), {'id', 'test_pk', 'test_str'})
+            self.assertEqual(doc['test_str'], str(doc['test_pk']))
+        for doc in TestDoc.find_iter({}, raw=True):
+            self.assertIsInstance(doc, dict)
+        doc = TestDoc.find_one({'id': docs[0]['id']}, raw=True)
+        self.assertEqual(doc['id'], docs[0]['id'])
+        doc = TestDoc.by_id(docs[0]['id'], raw=True)
+        self.assertEqual(doc['test_pk'], docs[0]['test_pk'])
+        docs = TestDoc.by_ids([doc['id'] for doc in docs], raw=True)
+        self.assertEqual(len(docs), 5)
+        self.assertIsInstance(docs[0], dict)
+
+    def test_find_metrics(self):
+        from mongo_driver import timer
+        self._clear()
+        self._feed_data(10)
+        timer.reset_metrics()
+        self.assertEqual(len(TestDoc.find({})), 10)
+        for doc in TestDoc.find_iter({}):
+            break
+        TestDoc.distinct({}, 'test_pk')
+        list(TestDoc.aggregate([{'$match': {'test_pk': {'$lt': 3}}}]))
+        metrics = timer.get_metrics()['test_doc']
+        timer.reset_metrics()
+        self.assertEqual(metrics['find']['count'], 2)
+        self.assertEqual(metrics['find']['documents'], 11)
+        self.assertEqual(metrics['distinct']['count'], 1)
+        self.assertEqual(metrics['aggregate']['documents'], 3)
+        # chained cursor calls keep the timing, single reads count bytes
+        timer.MEASURE_BYTES = True
+        try:
+            cur = TestDoc._find_raw({}).sort('test_pk', 1).limit(3)
+            self.assertEqual([son['test_pk'] for son in cur], [0, 1, 2])
+            TestDoc.find_one({'test_pk': 1})
+        finally:
+            timer.MEASURE_BYTES = False
+        metrics = timer.get_metrics()['test_doc']
+        timer.reset_metrics()
+        self.assertEqual(metrics['find']['count'], 2)
+        self.assertEqual(metrics['find']['documents'], 4)
+        self.assertGreater(metrics['find']['bytes'], 0)
+
+    def test_find_iter_prefetch(self):
+        self._clear()
+        self._feed_data(250)
+        docs = list(TestDoc.find_iter({}, sort=[('test_pk', 1)], prefetch=40))
+        self.assertEqual([doc.test_pk for doc in docs], list(range(250)))
+        # stopping early stops the prefetching thread
+        for doc in TestDoc.find_iter({}, prefetch=10, batch_size=5):
+            break
+        self.assertEqual(
+            [t for t in threading.enumerate()
+             if t.name == 'mongo_driver.prefetch'], [])
+        # errors in the prefetching thread are raised to the caller
+        TestDoc._son_converter = classmethod(
+            lambda cls, raw=False: lambda son: 1 / 0)
+        try:
+            with self.assertRaises(ZeroDivisionError):
+                for doc in TestDoc.find_iter({}, prefetch=10):
+                    pass
+        finally:
+            del TestDoc._son_converter
+
+    def test_find_batches(self):
+        self._clear()
+        self._feed_data(25)
+        batches = list(TestDoc.find_batches({}, sort=[('test_pk', 1)],
+                                            batch_size=10))
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        self.assertEqual([doc.test_pk for batch in batches for doc in batch],
+                         list(range(25)))
+        batches = list(TestDoc.find_batches({'test_pk': {'$lt': 10}},
+                                            batch_size=10, raw=True))
+        self.assertEqual(len(batches), 1)
+        self.assertIsInstance(batches[0][0], dict)
+        with self.assertRaises(ValueError):
+            list(TestDoc.find_batches({}, batch_size=0))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_find_columns(self):
+        self._clear()
+        self._feed_data(25)
+        TestDoc.update({'test_pk': 3}, {'$unset': {'test_int': True}})
+        columns = TestDoc.find_columns(
+            {'test_pk': {'$lt': 20}}, ['test_pk', 'test_int', 'test_str',
+                                       'test_list'],
+            sort=[('test_pk', 1)], batch_size=7)
+        self.assertEqual(columns['test_pk'].dtype, numpy.int64)
+        self.assertEqual(columns['test_pk'].tolist(), list(range(20)))
+        # missing ints turn the column into floats
+        self.assertEqual(columns['test_int'].dtype, numpy.float64)
+        self.assertTrue(numpy.isnan(columns['test_int'][3]))
+        self.assertEqual(columns['test_int'][4], 4)
+        self.assertEqual(columns['test_str'].dtype, object)
+        self.assertEqual(columns['test_str'][5], '5')
+        self.assertEqual(columns['test_list'][6], [6])
+        columns = TestDoc.find_columns({'test_pk': -1}, ['test_pk'])
+        self.assertEqual(len(columns['test_pk']), 0)
+        with self.assertRaises(ValueError):
+            TestDoc.find_columns({}, ['unknown'])
+        with self.assertRaises(ValueError):
+            TestDoc.find_columns({}, ['test_pk'], batch_size=0)
+        # non integral values are not truncated
+        TestDoc.update({'test_pk': 5}, {'$set': {'test_int': 5.5}})
+        columns = TestDoc.find_columns({'test_pk': {'$in': [4, 5]}},
+                                       ['test_int'], sort=[('test_pk', 1)])
+        self.assertEqual(columns['test_int'].dtype, numpy.float64)
+        self.assertEqual(columns['test_int'].tolist(), [4, 5.5])
+
+    def test_parallel_scan(self):
+        self._clear()
+        self._feed_data(100)
+        docs = list(TestDoc.parallel_scan({}, partitions=4, workers=2))
+        self.assertEqual(sorted(doc.test_pk for doc in docs),
+                         list(range(100)))
+        checkpoint = {}
+        docs = list(TestDoc.parallel_scan({'test_pk': {'$gte': 10}},
+                                          key='test_pk', partitions=4,
+                                          checkpoint=checkpoint, raw=True))
+        self.assertEqual(sorted(doc['test_pk'] for doc in docs),
+                         list(range(10, 100)))
+        # one more partition for null and missing keys
+        self.assertEqual(len(checkpoint['partitions']), 5)
+        self.assertTrue(all(p['done'] for p in checkpoint['partitions']))
+        self.assertEqual(list(TestDoc.parallel_scan(
+            {}, key='test_pk', checkpoint=checkpoint)), [])
+        TestDoc._pymongo().insert_many([{'test_int': 100},
+                                        {'test_int': 101, 'test_pk': None}])
+        docs = list(TestDoc.parallel_scan({}, key='test_pk', partitions=4))
+        self.assertEqual(sorted(doc.test_int for doc in docs),
+                         list(range(102)))
+        TestDoc.remove({'test_pk': {'$gte': 1}})
+        docs = list(TestDoc.parallel_scan({'test_int': {'$gte': 100}},
+                                          key='test_pk', partitions=4))
+        self.assertEqual(sorted(doc.test_int for doc in docs), [100, 101])
+        # keys of types ordered differently in BSON are not split
+        self._clear()
+        TestDoc._pymongo().insert_many(
+            [{'_id': str(i), 'test_pk': i} for i in range(5)] +
+            [{'_id': ObjectId(), 'test_pk': i} for i in range(5, 10)])
+        for sample in (False, True):
+            checkpoint = {}
+            docs = list(TestDoc.parallel_scan({}, partitions=4, raw=True,
+                                              sample=sample,
+                                              checkpoint=checkpoint))
+            self.assertEqual(sorted(doc['test_pk'] for doc in docs),
+                             list(range(10)))
+            self.assertEqual(len(checkpoint['partitions']), 2)
+
+    def test_parallel_scan_resume(self):
+        self._clear()
+        self._feed_data(100)
+        checkpoint = {}
+        seen = []
+        for doc in TestDoc.parallel_scan({}, key='test_pk', partitions=3,
+                                         workers=3, batch_size=5,
+                                         checkpoint=checkpoint):
+            seen.append(doc.test_pk)
+            if len(seen) == 30:
+                break
+        self.assertFalse(all(p['done'] for p in checkpoint['partitions']))
+        # the last document handed out is scanned again
+        for doc in TestDoc.parallel_scan({}, key='test_pk',
+                                         checkpoint=checkpoint):
+            seen.append(doc.test_pk)
+        self.assertEqual(sorted(set(seen)), list(range(100)))
+        self.assertLessEqual(len(seen), 101)
+        docs = list(TestDoc.parallel_scan({}, key='test_str', partitions=4,
+                                          sample=True))
+        self.assertEqual(len(docs), 100)
+
+    def test_paginate(self):
+        from mongo_driver.errors import InvalidQueryError
+        self._clear()
+        self._feed_data(25)
+        TestDoc.update({'test_pk': {'$lt': 10}}, {'$set': {'test_int': 0}})
+        for sort, expected in [
+                ([('test_pk', 1)], list(range(25))),
+                ([('test_pk', -1)], list(range(24, -1, -1))),
+                # test_int is not unique, ties are broken by _id
+                ([('test_int', 1)], list(range(25)))]:
+            pks, token, pages = [], None, 0
+            while True:
+                docs, token = TestDoc.paginate({}, sort, page_size=4,
+                                               after=token)
+                pages += 1
+                pks.extend(doc.test_pk for doc in docs)
+                if token is None:
+                    break
+            self.assertEqual(pks, expected)
+            self.assertEqual(pages, 7)
+        docs, token = TestDoc.paginate({'test_pk': {'$gte': 20}},
+                                       [('test_pk', 1)], page_size=5)
+        self.assertEqual(len(docs), 5)
+        self.assertIsNone(token)
+        with self.assertRaises(InvalidQueryError):
+            TestDoc.paginate({}, [('test_str', 1)])
+        docs, token = TestDoc.paginate({}, [('test_str', 1)], page_size=3,
+                                       check_index=False, raw=True)
+        self.assertEqual([doc['test_str'] for doc in docs], ['0', '1', '10'])
+        with self.assertRaises(ValueError):
+            TestDoc.paginate({}, [('test_pk', 1)], after=token)
+
+    def test_identity_map(self):
+        from mongo_driver import identity_map
+        self._clear()
+        self._feed_data(10)
+        docs = TestDoc.find({}, sort=[('test_pk', 1)])
+        with identity_map() as id_map:
+            doc = TestDoc.by_id(docs[0].id)
+            self.assertIs(TestDoc.by_id(docs[0].id), doc)
+            self.assertIs(TestDoc.find_one({'id': docs[0].id}), doc)
+            self.assertIsNot(TestDoc.by_id(docs[0].id, raw=True), doc)
+            # by_ids only reads the missing documents
+            by_ids = TestDoc.by_ids([d.id for d in docs[:3]])
+            self.assertEqual(len(by_ids), 3)
+            self.assertIn(doc, by_ids)
+            self.assertTrue(any(d is doc for d in by_ids))
+            self.assertEqual(len(id_map), 3)
+            doc.inc(test_int=1)
+            self.assertEqual(len(id_map), 0)
+            self.assertEqual(TestDoc.by_id(docs[0].id).test_int, 1)
+            # sorted and paged reads are not served from the map
+            by_ids = TestDoc.by_ids([d.id for d in docs[:3]],
+                                    sort=[('test_pk', -1)], limit=2)
+            self.assertEqual([d.id for d in by_ids],
+                             [docs[2].id, docs[1].id])
+            # bulk writes drop the entries once they are written
+            with TestDoc.bulk() as bulk_context:
+                doc = TestDoc.by_id(docs[0].id)
+                doc.bulk_inc(bulk_context, test_int=1)
+                self.assertIs(TestDoc.by_id(docs[0].id), doc)
+            self.assertEqual(TestDoc.by_id(docs[0].id).test_int, 2)
+        self.assertIsNot(TestDoc.by_id(docs[0].id), TestDoc.by_id(docs[0].id))
+        # reloads read the database
+        with identity_map():
+            doc = TestDoc.by_id(docs[1].id)
+            TestDoc._pymongo().update_one({'_id': doc.id},
+                                          {'$set': {'test_int': 50}})
+            doc.reload()
+            self.assertEqual(doc.test_int, 50)
+
+    def test_read_cache(self):
+        from mongo_driver.cache import get_document_cache
+        CachedDoc.remove({})
+        docs = [CachedDoc(name=str(i), value=i) for i in range(5)]
+        for doc in docs:
+            doc.save()
+        cache = get_document_cache(CachedDoc)
+        self.assertEqual(len(cache), 0)
+        doc = CachedDoc.by_id(docs[0].id)
+        self.assertEqual(doc.value, 0)
+        self.assertEqual(CachedDoc.find_one({'name': '1'}).value, 1)
+        self.assertEqual(len(cache), 2)
+        # hits are served without reading the collection
+        CachedDoc._pymongo().update_one({'name': '1'}, {'$set': {'value': 9}})
+        self.assertEqual(CachedDoc.find_one({'name': '1'}).value, 1)
+        self.assertEqual(CachedDoc.find_one({'value': 1}), None)
+        # writes through the class invalidate the cache
+        doc.inc(value=1)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(CachedDoc.find_one({'name': '1'}).value, 9)
+        by_ids = CachedDoc.by_ids([d.id for d in docs])
+        self.assertEqual(sorted(d.value for d in by_ids), [1, 2, 3, 4, 9])
+        # the least recently used entries are evicted
+        self.assertEqual(len(cache), 3)
+        by_ids = CachedDoc.by_ids([d.id for d in docs], raw=True)
+        self.assertEqual(len(by_ids), 5)
+        self.assertIsInstance(by_ids[0], dict)
+        cache.ttl = -1
+        cache.clear()
+        CachedDoc.by_id(docs[4].id)
+        self.assertIsNone(cache.get((('_id', docs[4].id),)))
+        cache.ttl = 60
+        # bulk writes invalidate once written, reads before get cached
+        with CachedDoc.bulk() as bulk_context:
+            docs[2].bulk_set(bulk_context, value=20)
+            self.assertEqual(CachedDoc.by_id(docs[2].id).value, 2)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(CachedDoc.by_id(docs[2].id).value, 20)
+        # reloads skip the cache and refresh it
+        doc = CachedDoc.by_id(docs[3].id)
+        CachedDoc._pymongo().update_one({'_id': doc.id},
+                                        {'$set': {'value': 30}})
+        self.assertEqual(CachedDoc.by_id(docs[3].id).value, 3)
+        doc.reload()
+        self.assertEqual(doc.value, 30)
+        self.assertEqual(CachedDoc.by_id(docs[3].id).value, 30)
+        CachedDoc.drop_collection()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(CachedDoc.by_id(docs[2].id))
+
+    def test_gather(self):
+        from mongo_driver import gather
+        from mongo_driver.errors import GatherTimeoutError
+        self._clear()
+        self._feed_data(10)
+        docs, doc, count, missing = gather([
+            TestDoc.q({'test_pk': {'$lt': 3}}, sort=[('test_pk', 1)]),
+            TestDoc.q({'test_pk': 5}).one(),
+            TestDoc.q({'test_pk': {'$gte': 4}}).count(),
+            TestDoc.q({'test_pk': -1}).one(),
+        ], timeout=10)
+        self.assertEqual([d.test_pk for d in docs], [0, 1, 2])
+        self.assertEqual(doc.test_pk, 5)
+        self.assertEqual(count, 6)
+        self.assertIsNone(missing)
+        self.assertEqual(gather([]), [])
+        with self.assertRaises(TypeError):
+            gather([TestDoc.q({}, unknown=1)])
+        event = threading.Event()
+        slow = TestDoc.q({})
+        slow.run = lambda max_time_ms=None: event.wait(5)
+        try:
+            with self.assertRaises(GatherTimeoutError):
+                gather([slow], timeout=0.05)
+        finally:
+            event.set()
+        # find arguments the method does not take are left out
+        query = TestDoc.q({'test_pk': {'$gte': 4}}, sort=[('test_pk', 1)],
+                          skip=1, projection={'test_pk': True})
+        count, doc = gather([query.count(), query.one()])
+        self.assertEqual(count, 5)
+        self.assertEqual(doc.test_pk, 4)
+        # queries starting after the timeout are not run
+        from mongo_driver.query import _run_query
+        with self.assertRaises(GatherTimeoutError):
+            _run_query(slow, time.monotonic() - 1)
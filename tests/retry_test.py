@@ -1 +1,82 @@
-#TODO add retry test cases
\ No newline at end of file
+import unittest
+from bson import ObjectId
+from pymongo.errors import ConnectionFailure
+from mongo_driver import Document, IntField
+from mongo_driver.retry_policy import RetryPolicy
+
+
+class RecordingPolicy(RetryPolicy):
+    def __init__(self, *args, **kwargs):
+        super(RecordingPolicy, self).__init__(*args, **kwargs)
+        self.sleeps = []
+
+    def _sleep(self, delay):
+        self.sleeps.append(delay)
+
+
+class RetryDoc(Document):
+    meta = {
+        'db_name': 'test',
+        'retry': {'tries': 2, 'deadline': None},
+    }
+    test_int = IntField()
+
+    failures = 0
+    calls = 0
+
+    @classmethod
+    def _find_raw(cls, filter, **kwargs):
+        cls.calls += 1
+        if cls.failures:
+            cls.failures -= 1
+            raise ConnectionFailure('connection lost')
+        son = {'_id': ObjectId(), 'test_int': 1}
+        return son if kwargs.get('find_one') else [son]
+
+
+class RetryTests(unittest.TestCase):
+    def _run(self, failures, func, *args, **kwargs):
+        RetryDoc.failures = failures
+        RetryDoc.calls = 0
+        return func(*args, **kwargs)
+
+    def test_retry(self):
+        policy = RecordingPolicy(tries=5, base_delay=1, max_delay=3,
+                                 deadline=None)
+        docs = self._run(4, RetryDoc.find, {}, retry_policy=policy)
+        self.assertEqual(len(docs), 1)
+        self.assertEqual(RetryDoc.calls, 5)
+        self.assertEqual(len(policy.sleeps), 4)
+        for attempt, delay in enumerate(policy.sleeps):
+            self.assertLessEqual(delay, min(3, 2 ** attempt))
+        with self.assertRaises(ConnectionFailure):
+            self._run(5, RetryDoc.find, {}, retry_policy=policy)
+        self.assertEqual(RetryDoc.calls, 5)
+
+    def test_retry_deadline(self):
+        policy = RecordingPolicy(tries=10, base_delay=100, deadline=0)
+        with self.assertRaises(ConnectionFailure):
+            self._run(1, RetryDoc.find, {}, retry_policy=policy)
+        self.assertEqual(RetryDoc.calls, 1)
+        self.assertEqual(policy.sleeps, [])
+
+    def test_retry_meta(self):
+        sleeps = []
+        sleep = RetryPolicy._sleep
+        RetryPolicy._sleep = lambda self, delay: sleeps.append(delay)
+        try:
+            with self.assertRaises(ConnectionFailure):
+                self._run(2, RetryDoc.find_one, {})
+            self.assertEqual(RetryDoc.calls, 2)
+            self.assertEqual(len(sleeps), 1)
+        finally:
+            RetryPolicy._sleep = sleep
+
+    def test_single_retry_layer(self):
+        policy = RecordingPolicy(tries=3, deadline=None)
+        # by_id calls find_one, both retryable: 3 tries, not 3 * 3
+        with self.assertRaises(ConnectionFailure):
+            self._run(10, RetryDoc.by_id, ObjectId(), retry_policy=policy)
+        self.assertEqual(RetryDoc.calls, 3)
+        doc = self._run(2, RetryDoc.by_id, ObjectId(), retry_policy=policy)
+        self.assertEqual(doc.test_int, 1)
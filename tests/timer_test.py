@@ -0,0 +1,41 @@
+import unittest
+from mongo_driver import timer
+
+
+class TimerTests(unittest.TestCase):
+    def tearDown(self):
+        timer.reset_metrics()
+        timer.set_slow_event_callback(None)
+
+    def test_histogram(self):
+        histogram = timer.LatencyHistogram()
+        self.assertIsNone(histogram.percentile(50))
+        for i in range(1, 101):
+            histogram.record(i * 1000000)
+        summary = histogram.snapshot()
+        self.assertEqual(summary['count'], 100)
+        self.assertEqual(summary['min_ms'], 1)
+        self.assertEqual(summary['max_ms'], 100)
+        self.assertAlmostEqual(summary['mean_ms'], 50.5)
+        # buckets are ~19% wide
+        self.assertAlmostEqual(summary['p50_ms'], 50, delta=10)
+        self.assertAlmostEqual(summary['p95_ms'], 95, delta=10)
+        self.assertLessEqual(summary['p99_ms'], 100)
+
+    def test_log_slow_event(self):
+        events = []
+        timer.set_slow_event_callback(
+            lambda *args: events.append(args))
+        for _ in range(3):
+            with timer.log_slow_event('find', 'test_doc', {}):
+                pass
+        with timer.log_slow_event('update', 'test_doc', {'a': 1},
+                                  threshold=-1):
+            pass
+        snapshot = timer.get_metrics()
+        self.assertEqual(snapshot['test_doc']['find']['count'], 3)
+        self.assertEqual(snapshot['test_doc']['update']['count'], 1)
+        self.assertEqual([event[:3] for event in events],
+                         [('update', 'test_doc', {'a': 1})])
+        timer.reset_metrics()
+        self.assertEqual(timer.get_metrics(), {})
@@ -5,6 +5,15 @@ from mongo_driver.errors import OperationError
 from tests.model.testdoc import *
 from mongo_driver.connection import connect, clear_all
 from mongo_driver.errors import ConnectionError
+from mongo_driver import Document, IntField
+
+
+class NullDoc(Document):
+    meta = {
+        'db_name': 'test',
+        'force_insert': False,
+    }
+    value = IntField(null=True)
 
 
 class WriteTests(unittest.TestCase):
@@ -47,6 +56,46 @@ class WriteTests(unittest.TestCase):
         doc.reload()
         self.assertEqual(doc.test_pk, 9)
 
+    def test_save_delta(self):
+        self._clear()
+        doc = TestDoc(test_pk=1, test_int=1, test_list=[1, 2],
+                      test_edoc=TestEDoc(test_int=1), test_dict={'a': 1})
+        doc.save(delta=True)
+        self.assertEqual(TestDoc.count({}), 1)
+        # concurrent changes to other fields are kept
+        TestDoc.update({'test_pk': 1}, {'$set': {'test_str': 'x'}})
+        doc.test_list[1] = 5
+        doc.test_edoc.test_int = 2
+        doc.test_dict['b'] = 2
+        doc.test_int = None
+        doc.save(delta=True)
+        self.assertEqual(doc._get_changed_fields(), [])
+        doc = TestDoc.find_one({'test_pk': 1})
+        self.assertEqual(doc.test_str, 'x')
+        self.assertEqual(doc.test_list, [1, 5])
+        self.assertEqual(doc.test_edoc.test_int, 2)
+        self.assertEqual(doc.test_dict, {'a': 1, 'b': 2})
+        self.assertEqual(doc.test_int, None)
+        doc.test_pk = 2
+        doc.save(delta=True)
+        self.assertEqual(TestDoc.count({'test_pk': 2}), 1)
+        self.assertEqual(TestDoc.count({}), 1)
+
+    def test_save_delta_null(self):
+        NullDoc.remove({})
+        doc = NullDoc(value=1)
+        doc.save(delta=True)
+        doc.value = None
+        doc.save(delta=True)
+        son = NullDoc._pymongo().find_one({'_id': doc.id})
+        self.assertIn('value', son)
+        self.assertIsNone(son['value'])
+        # saves without delta keep the changed fields
+        doc.value = 2
+        doc.save()
+        self.assertEqual(doc._get_changed_fields(), ['value'])
+        NullDoc.remove({})
+
     def test_delete(self):
         self._clear()
         self._feed_data(10)
@@ -209,6 +258,34 @@ class WriteTests(unittest.TestCase):
         doc.set(test_int=-1)
         self.assertEqual(doc.test_int, -1)
 
+    def test_update_one_returning(self):
+        self._clear()
+        doc = TestDoc(test_pk=1, test_int=1, test_str='1', test_list=[1])
+        doc.save()
+        other = TestDoc.find_one({'test_pk': 1})
+        other.set(test_str='2')
+        result = doc.inc(_returning='fields', test_int=2)
+        self.assertEqual(doc.test_int, 3)
+        self.assertEqual(doc.test_str, '1')
+        self.assertEqual(result.test_int, 3)
+        self.assertEqual(result.test_str, None)
+        result = doc.update_one({'$set': {'test_list.0': 5}},
+                                returning='fields')
+        self.assertEqual(doc.test_list, [5])
+        from mongo_driver import timer
+        timer.reset_metrics()
+        result = doc.inc(_returning='none', test_int=2)
+        self.assertEqual(result['modified_count'], 1)
+        metrics = timer.get_metrics()['test_doc']
+        timer.reset_metrics()
+        self.assertEqual(metrics['update_one']['count'], 1)
+        self.assertEqual(doc.test_int, 3)
+        self.assertEqual(TestDoc.find_one({'test_pk': 1}).test_int, 5)
+        doc.set(test_int=0)
+        self.assertEqual(doc.test_str, '2')
+        with self.assertRaises(ValueError):
+            doc.set(_returning='all', test_int=0)
+
     def test_update_document_transform(self):
         import datetime
         self._clear()